@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides the age buckets shared by the exporter and the
+server, which only distinguish ages the UI shows differently.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import numpy as np
+
+
+"""Lower bounds of the age buckets. They match the colors used by
+CellsView.ink(): just born, born one generation ago, between 2 and 4
+generations ago, and 5 or more.
+"""
+AGE_BUCKETS = np.array([0, 1, 2, 5])
+
+
+def age_buckets(ages):
+    """Returns the bucket of each age."""
+    return np.searchsorted(AGE_BUCKETS, ages, side='right') - 1
@@ -0,0 +1,573 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides a class that implements the Game of Life on grids
+split into blocks, each one computed by a worker process reached over TCP.
+
+Workers are started with the gameoflife-worker command, on as many hosts as
+needed:
+
+    gameoflife-worker --port 7171
+
+and the coordinator (GameDistributed) connects to them. The addresses of the
+workers can be given in the GAMEOFLIFE_WORKERS environment variable, e.g.
+'host1:7171,host2:7171', which lets the UI view a distributed run with
+--impl distributed.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import json
+import os
+import socket
+import struct
+from argparse import ArgumentParser
+
+try:
+    import socketserver
+except ImportError:
+    # Python 2
+    import SocketServer as socketserver
+
+import numpy as np
+
+from gameoflife.gameoflife import GameOfLife, Snapshot
+from gameoflife.gamenumpy import BaseGameNumPy, GameNumPyLight, readonly
+from gameoflife.populate import RandomCells
+
+
+"""Default TCP port of the workers."""
+DEFAULT_PORT = 7171
+
+"""Environment variable holding the addresses of the workers."""
+WORKERS_VARIABLE = 'GAMEOFLIFE_WORKERS'
+
+"""Header of the messages: length of the JSON part, and length of the
+arrays that follow it.
+"""
+HEADER = struct.Struct('!II')
+
+
+def send_message(sock, message, *arrays):
+    """Sends a message (a JSON-serializable dict) followed by arrays of
+    cells.
+    """
+    arrays = [np.ascontiguousarray(array, dtype=np.uint8) for array in arrays]
+    message = dict(message, shapes=[array.shape for array in arrays])
+    data = json.dumps(message).encode('utf-8')
+    payload = b''.join(array.tobytes() for array in arrays)
+    sock.sendall(HEADER.pack(len(data), len(payload)) + data + payload)
+
+
+def _recv_exactly(sock, size):
+    """Receives exactly size bytes. Returns None if the connection was closed
+    before any byte was received.
+    """
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            if received == 0:
+                return None
+            raise IOError('connection closed in the middle of a message')
+        received += count
+    return buf
+
+
+def recv_message(sock):
+    """Receives a message sent by send_message(). Returns the message and the
+    list of arrays, or (None, None) if the connection was closed.
+    """
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None, None
+    data_size, payload_size = HEADER.unpack(bytes(header))
+    message = json.loads(bytes(_recv_exactly(sock, data_size)).decode('utf-8'))
+    payload = _recv_exactly(sock, payload_size) if payload_size else b''
+
+    arrays = []
+    offset = 0
+    for shape in message.pop('shapes'):
+        size = int(np.prod(shape))
+        arrays.append(np.frombuffer(payload, dtype=np.uint8, count=size,
+                                    offset=offset).reshape(shape))
+        offset += size
+    return message, arrays
+
+
+def parse_address(address):
+    """Parses a 'host:port' (or just 'host') worker address."""
+    host, _, port = address.strip().rpartition(':')
+    if not host:
+        return port, DEFAULT_PORT
+    return host, int(port)
+
+
+def workers_from_environment():
+    """Returns the worker addresses found in the environment."""
+    value = os.environ.get(WORKERS_VARIABLE, '')
+    return [parse_address(address) for address in value.split(',')
+            if address.strip()]
+
+
+class Block(object):
+    """Block of the grid computed by a worker.
+
+    The block is kept in a local game, with a ghost zone of ghost cells on
+    each side holding copies of the neighboring blocks' edges. Each
+    generation corrupts the outermost valid row and column of the ghost zone
+    (the local game doesn't know what lies beyond it), so the block itself
+    stays exact for ghost generations after the ghost zone is refreshed.
+    """
+
+    def __init__(self, height, width, ghost):
+        self.height, self.width, self.ghost = height, width, ghost
+        self.game = GameNumPyLight(width + 2 * ghost, height + 2 * ghost)
+
+    @property
+    def cells(self):
+        """View of the block's own cells, without the ghost zone."""
+        ghost = self.ghost
+        return self.game.cells[ghost:ghost + self.height,
+                               ghost:ghost + self.width]
+
+    def populate(self, prob, seed, row, col, width):
+        """Populates the block at random, with specified probability, as the
+        part of a grid of the specified width whose top left corner is at the
+        specified row and column.
+        """
+        self.game.cells.fill(0)
+        RandomCells(prob, seed).fill(self.cells, row, col, width)
+
+    def load(self, cells):
+        """Sets the block's cells."""
+        self.game.cells.fill(0)
+        self.cells[...] = cells
+
+    def edges(self):
+        """Returns the cells of the block that its neighbors need, as the
+        ghost first and last rows, and the ghost first and last columns.
+        """
+        ghost, cells = self.ghost, self.cells
+        rows = np.concatenate((cells[:ghost], cells[-ghost:]))
+        cols = np.concatenate((cells[:, :ghost], cells[:, -ghost:]), axis=1)
+        return rows, cols
+
+    def set_halo(self, rows, cols):
+        """Fills the ghost zone: rows holds the rows above and below the
+        block (corners included), and cols the columns on its left and right.
+        """
+        ghost, padded = self.ghost, self.game.cells
+        padded[:ghost] = rows[:ghost]
+        padded[-ghost:] = rows[ghost:]
+        padded[ghost:-ghost, :ghost] = cols[:, :ghost]
+        padded[ghost:-ghost, -ghost:] = cols[:, ghost:]
+
+    def step(self, count):
+        """Computes count generations."""
+        for _ in range(count):
+            self.game.next_generation()
+
+
+class WorkerHandler(socketserver.BaseRequestHandler):
+    """Serves the requests of a coordinator for one block."""
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        block = None
+        while True:
+            message, arrays = recv_message(self.request)
+            if message is None:
+                break
+
+            command = message['command']
+            reply, reply_arrays = {}, ()
+            try:
+                if command == 'init':
+                    block = Block(message['height'], message['width'],
+                                  message['ghost'])
+                elif command == 'populate':
+                    block.populate(message['prob'], message['seed'],
+                                   message['row'], message['col'],
+                                   message['grid_width'])
+                elif command == 'load':
+                    block.load(arrays[0])
+                elif command == 'edges':
+                    reply_arrays = block.edges()
+                elif command == 'halo':
+                    block.set_halo(*arrays)
+                elif command == 'step':
+                    block.step(message['count'])
+                elif command == 'cells':
+                    reply_arrays = (block.cells[message['rows'][0]:
+                                                message['rows'][1],
+                                                message['cols'][0]:
+                                                message['cols'][1]],)
+                else:
+                    raise ValueError('unknown command {}'.format(command))
+            except Exception as e:
+                reply = {'error': '{}: {}'.format(type(e).__name__, e)}
+
+            send_message(self.request, reply, *reply_arrays)
+
+
+class WorkerServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Worker server. Each connection is a block, so a single worker can
+    compute several blocks.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def make_server(host='', port=DEFAULT_PORT):
+    """Creates a worker server listening on the specified address. Port 0
+    picks any free port (see the server's server_address).
+    """
+    return WorkerServer((host, port), WorkerHandler)
+
+
+class GameDistributed(GameOfLife):
+    """Distributed implementation of the Game of Life.
+
+    The torus is split into a grid of blocks, each one computed by a worker
+    with the NumPy light implementation. After every ghost generations, the
+    coordinator collects the edges of all blocks and sends each block the
+    edges of its neighbors, so the workers only synchronize every ghost
+    generations, at the cost of computing a ghost-cell wide margin around
+    their block.
+
+    The coordinator never holds the whole grid: fates are derived on demand
+    for the requested region, from the cells fetched from the workers that
+    hold it. Like the light implementations, it does not keep track of the
+    ages of the cells.
+    """
+
+    # Default width of the ghost zone, i.e. number of generations between
+    # synchronizations
+    GHOST = 1
+
+    def __init__(self, width, height, workers=None, ghost=GHOST, grid=None):
+        """Creates a new instance of the Game of Life, computed by the
+        specified workers (a list of (host, port) pairs, by default read from
+        the GAMEOFLIFE_WORKERS environment variable).
+
+        grid is the number of blocks on each axis, as (rows, cols), and must
+        match the number of workers. By default, the torus is split into
+        horizontal stripes, one per worker.
+        """
+        if workers is None:
+            workers = workers_from_environment()
+        if not workers:
+            raise ValueError('no workers given (set {} to a list of '
+                             'host:port addresses)'.format(WORKERS_VARIABLE))
+        if grid is None:
+            grid = (len(workers), 1)
+        if grid[0] * grid[1] != len(workers):
+            raise ValueError('a {}x{} grid of blocks needs {} workers, not {}'
+                             .format(grid[0], grid[1], grid[0] * grid[1],
+                                     len(workers)))
+
+        if ghost < 1:
+            raise ValueError('the ghost zone must be at least 1 cell wide')
+
+        self.ghost = ghost
+        self.grid = tuple(grid)
+
+        # Boundaries of the blocks on each axis
+        self.row_bounds = [height * i // grid[0] for i in range(grid[0] + 1)]
+        self.col_bounds = [width * i // grid[1] for i in range(grid[1] + 1)]
+        if min(np.diff(self.row_bounds)) < ghost or \
+                min(np.diff(self.col_bounds)) < ghost:
+            raise ValueError('blocks must be at least {} cells wide'
+                             .format(ghost))
+
+        # Connections to the workers, indexed like the blocks
+        self._sockets = []
+        for address in workers:
+            sock = socket.create_connection(tuple(address))
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sockets.append(sock)
+
+        super(GameDistributed, self).__init__(width, height)
+
+    def _init(self):
+        """Initializes the internal structures used by the implementation."""
+        self._call([(index, {'command': 'init',
+                             'height': self._block_shape(index)[0],
+                             'width': self._block_shape(index)[1],
+                             'ghost': self.ghost})
+                    for index in range(len(self._sockets))])
+
+        # Number of generations that can be computed before the ghost zones
+        # need to be refreshed
+        self._margin = 0
+
+        # Number of generations counted but not computed by the workers yet
+        self._pending = 0
+
+    def close(self):
+        """Closes the connections to the workers."""
+        for sock in self._sockets:
+            sock.close()
+        self._sockets = []
+
+    def __del__(self):
+        if hasattr(self, '_sockets'):
+            self.close()
+
+    def fork(self):
+        """Forking is not supported: the cells are held by the workers, and
+        the coordinator never gathers the whole grid.
+        """
+        raise NotImplementedError('distributed games cannot be forked')
+
+    def _block_index(self, block_row, block_col):
+        """Returns the index of the specified block, wrapping around."""
+        return ((block_row % self.grid[0]) * self.grid[1] +
+                block_col % self.grid[1])
+
+    def _block_shape(self, index):
+        """Returns the shape of the specified block."""
+        block_row, block_col = divmod(index, self.grid[1])
+        return (self.row_bounds[block_row + 1] - self.row_bounds[block_row],
+                self.col_bounds[block_col + 1] - self.col_bounds[block_col])
+
+    def _call(self, requests):
+        """Sends requests, as (block index, message, arrays...) tuples, then
+        waits for all the replies, so that the workers process them in
+        parallel. Returns the list of arrays of each reply.
+        """
+        for request in requests:
+            send_message(self._sockets[request[0]], *request[1:])
+
+        replies = []
+        for request in requests:
+            message, arrays = recv_message(self._sockets[request[0]])
+            if message is None:
+                raise IOError('worker of block {} disconnected'
+                              .format(request[0]))
+            if 'error' in message:
+                raise RuntimeError('worker of block {} failed: {}'
+                                   .format(request[0], message['error']))
+            replies.append(arrays)
+        return replies
+
+    def populate_random(self, prob=0.5, seed=None):
+        """Populates the grid of cells at random, with specified
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
+        """
+
+        # Each worker draws its own block of the same grid
+        seed = RandomCells(prob, seed).seed
+        requests = []
+        for index in range(len(self._sockets)):
+            block_row, block_col = divmod(index, self.grid[1])
+            requests.append((index, {'command': 'populate', 'prob': prob,
+                                     'seed': seed,
+                                     'row': self.row_bounds[block_row],
+                                     'col': self.col_bounds[block_col],
+                                     'grid_width': self.width}))
+        self._call(requests)
+
+        # Pending generations would only compute the previous grid
+        self._margin = self._pending = 0
+
+    def load(self, cells):
+        """Sets the whole grid of cells."""
+        requests = []
+        for index in range(len(self._sockets)):
+            block_row, block_col = divmod(index, self.grid[1])
+            requests.append((index, {'command': 'load'},
+                             cells[self.row_bounds[block_row]:
+                                   self.row_bounds[block_row + 1],
+                                   self.col_bounds[block_col]:
+                                   self.col_bounds[block_col + 1]]))
+        self._call(requests)
+        self._margin = self._pending = 0
+
+    @property
+    def cells(self):
+        """Copy of the whole grid of cells, fetched from the workers."""
+        return self._window(0, 0, self.height, self.width)
+
+    def _snapshot(self):
+        """Returns a Snapshot of the current state of the game. The cells are
+        fetched from the workers into a read-only copy of the whole grid, so
+        this is only suitable for grids that fit in the coordinator's memory.
+        """
+        return Snapshot(self.generation, readonly(self.cells),
+                        None, None, None)
+
+    def _step(self):
+        """Computes the next generation of cells based on the current one.
+
+        Generations are only counted, until they use up the ghost zones:
+        the workers then compute them all at once, so that they only
+        synchronize every ghost generations. Reading the cells computes the
+        pending generations first.
+        """
+        self._pending += 1
+        if self._pending >= (self._margin or self.ghost):
+            self._flush()
+
+    def _flush(self):
+        """Has the workers compute the pending generations. The ghost zones
+        are refreshed whenever they are used up, along with the step.
+        """
+        while self._pending:
+            requests = []
+            if self._margin == 0:
+                requests = self._halo_requests()
+                self._margin = self.ghost
+
+            count = min(self._pending, self._margin)
+            self._call(requests +
+                       [(index, {'command': 'step', 'count': count})
+                        for index in range(len(self._sockets))])
+            self._margin -= count
+            self._pending -= count
+
+    def _halo_requests(self):
+        """Fetches the edges of all blocks, and returns the requests that
+        refresh the ghost zones of the blocks with the edges of their
+        neighbors.
+        """
+        ghost = self.ghost
+        edges = self._call([(index, {'command': 'edges'})
+                            for index in range(len(self._sockets))])
+
+        requests = []
+        for index in range(len(self._sockets)):
+            block_row, block_col = divmod(index, self.grid[1])
+
+            def neighbor(drow, dcol):
+                return edges[self._block_index(block_row + drow,
+                                               block_col + dcol)]
+
+            # Rows above and below the block, with the corners taken from the
+            # columns of the diagonal neighbors
+            top = np.hstack((neighbor(-1, -1)[1][-ghost:, ghost:],
+                             neighbor(-1, 0)[0][ghost:],
+                             neighbor(-1, 1)[1][-ghost:, :ghost]))
+            bottom = np.hstack((neighbor(1, -1)[1][:ghost, ghost:],
+                                neighbor(1, 0)[0][:ghost],
+                                neighbor(1, 1)[1][:ghost, :ghost]))
+
+            # Columns on the left and right of the block
+            left = neighbor(0, -1)[1][:, ghost:]
+            right = neighbor(0, 1)[1][:, :ghost]
+
+            requests.append((index, {'command': 'halo'},
+                             np.vstack((top, bottom)),
+                             np.hstack((left, right))))
+        return requests
+
+    def _window(self, row, col, height, width):
+        """Returns the cells of the specified region, wrapping around the
+        edges of the torus.
+        """
+        self._flush()
+        rows = np.arange(row, row + height) % self.height
+        cols = np.arange(col, col + width) % self.width
+        block_rows = np.searchsorted(self.row_bounds, rows, side='right') - 1
+        block_cols = np.searchsorted(self.col_bounds, cols, side='right') - 1
+
+        # Fetch the bounding box of the needed cells from each block
+        requests, selections = [], []
+        for block_row in np.unique(block_rows):
+            in_rows = block_rows == block_row
+            local_rows = rows[in_rows] - self.row_bounds[block_row]
+            for block_col in np.unique(block_cols):
+                in_cols = block_cols == block_col
+                local_cols = cols[in_cols] - self.col_bounds[block_col]
+                requests.append((self._block_index(block_row, block_col),
+                                 {'command': 'cells',
+                                  'rows': [int(local_rows.min()),
+                                           int(local_rows.max()) + 1],
+                                  'cols': [int(local_cols.min()),
+                                           int(local_cols.max()) + 1]}))
+                selections.append((in_rows, local_rows - local_rows.min(),
+                                   in_cols, local_cols - local_cols.min()))
+
+        window = np.zeros((height, width), dtype=np.uint8)
+        for (cells,), (in_rows, local_rows, in_cols, local_cols) in \
+                zip(self._call(requests), selections):
+            window[np.ix_(in_rows, in_cols)] = cells[np.ix_(local_rows,
+                                                            local_cols)]
+        return window
+
+    def block_population(self, row, col, height, width, zoom):
+        """Returns the number of live cells in each zoom x zoom block of the
+        specified region, as an array indexed by [row, col] of the block.
+        """
+        window = self._window(row, col, height * zoom, width * zoom)
+        return BaseGameNumPy._sum_blocks(window, np.arange(width * zoom), zoom)
+
+    def fate(self, row, col):
+        """Returns the fate of the cell at the specified location."""
+        fates, _ = self.region(row, col, 1, 1)
+        return fates[0, 0]
+
+    def age(self, row, col):
+        """Returns the age of a cell, i.e. how many generations it's been in
+        its current state (dead or alive).
+        """
+
+        # The distributed implementation does not know the ages, so it cheats
+        # and returns a constant value.
+        return 1000
+
+    def region(self, row, col, height, width):
+        """Returns the fates and ages of the cells in the specified region, as
+        a pair of arrays indexed by [row, col] relative to the region's top
+        left corner. The region wraps around the edges of the torus.
+        """
+        window = self._window(row - 1, col - 1, height + 2, width + 2)
+        fates = BaseGameNumPy._fates_from_window(window)
+        ages = np.empty((height, width), dtype=np.int64)
+        ages.fill(1000)
+        return fates, ages
+
+
+def main():
+    """Entry point for gameoflife-worker."""
+    parser = ArgumentParser(prog='gameoflife-worker',
+                            description='Worker for distributed Games of '
+                                        'Life')
+    parser.add_argument('--host', type=str, default='',
+                        help='address to listen on (default: all)')
+    parser.add_argument('--port', '-p', type=int, default=DEFAULT_PORT,
+                        help='port to listen on (default: {})'
+                             .format(DEFAULT_PORT))
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port)
+    host, port = server.server_address[:2]
+    print('Worker listening on {}:{}'.format(host or '*', port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides the registry of game implementations (engines), and
+the automatic selection of the fastest one.
+
+Third-party packages can register their own engines through the
+'gameoflife.engines' entry point group, e.g. in their setup.py:
+
+    entry_points={
+        'gameoflife.engines': ['myengine = mypackage.mymodule:MyGame']
+    }
+
+The entry point's name is the name of the engine, and it must point to a
+subclass of GameOfLife.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import importlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+
+"""Entry point group for third-party engines."""
+ENTRY_POINT_GROUP = 'gameoflife.engines'
+
+"""Time spent measuring each engine during calibration, in seconds."""
+CALIBRATION_BUDGET = 0.5
+
+"""Size of the grid used to estimate the cost of an engine, before actually
+measuring it at the requested size.
+"""
+ESTIMATE_SIZE = 64
+
+"""Size of the region queried at each generation during calibration, as a
+typical terminal window.
+"""
+VIEWPORT_HEIGHT, VIEWPORT_WIDTH = 24, 80
+
+
+class Engine(object):
+    """A registered game implementation."""
+
+    def __init__(self, name, path, requires=(), full=True, loader=None):
+        """Creates a new engine.
+
+        path is the location of the class, as 'module:Class'. requires is a
+        list of the modules needed by the engine. full is True if the engine
+        keeps track of the fates and ages of the cells. loader, if given, is
+        a function returning the class, used instead of importing path.
+        """
+        self.name = name
+        self.path = path
+        self.requires = tuple(requires)
+        self.full = full
+        self._loader = loader
+
+    def missing(self):
+        """Returns the list of the required modules that can't be found."""
+        return [module for module in self.requires
+                if not module_available(module)]
+
+    def available(self):
+        """Returns True if all the modules required by the engine can be
+        found.
+        """
+        return not self.missing()
+
+    def load(self):
+        """Imports the engine and returns its class."""
+        if self._loader is not None:
+            return self._loader()
+        module, cls = self.path.split(':')
+        return getattr(importlib.import_module(module), cls)
+
+
+def module_available(name):
+    """Returns True if the specified module can be found, without importing
+    it.
+    """
+    try:
+        from importlib.util import find_spec
+    except ImportError:
+        # Python 2
+        import imp
+        try:
+            imp.find_module(name)
+        except ImportError:
+            return False
+        return True
+    return find_spec(name) is not None
+
+
+_registry = OrderedDict()
+_entry_points_loaded = False
+
+
+def register(name, path, requires=(), full=True, loader=None):
+    """Registers an engine. See Engine for the arguments."""
+    _registry[name] = Engine(name, path, requires, full, loader)
+
+
+def _load_entry_points():
+    """Registers the engines declared by installed packages."""
+    global _entry_points_loaded
+
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            from pkg_resources import iter_entry_points
+        except ImportError:
+            return
+        found = iter_entry_points(ENTRY_POINT_GROUP)
+    else:
+        found = entry_points()
+        if hasattr(found, 'select'):
+            found = found.select(group=ENTRY_POINT_GROUP)
+        else:
+            found = found.get(ENTRY_POINT_GROUP, [])
+
+    for entry_point in found:
+        if entry_point.name not in _registry:
+            register(entry_point.name,
+                     getattr(entry_point, 'value', str(entry_point)),
+                     loader=entry_point.load)
+
+
+def names(builtin=False):
+    """Returns the names of all registered engines, or only of the built-in
+    ones (and those registered by calling register()) if builtin is True.
+    """
+    if not builtin:
+        _load_entry_points()
+    return list(_registry)
+
+
+def get(name):
+    """Returns the registered engine with the specified name. Raises
+    KeyError if there is none.
+    """
+
+    # Looking up entry points takes a while, so only do it for engines that
+    # aren't built in
+    if name not in _registry:
+        _load_entry_points()
+    return _registry[name]
+
+
+# Built-in engines
+register('normal', 'gameoflife.gamepython:GamePython')
+register('light', 'gameoflife.gamepython:GamePythonLight', full=False)
+register('lazy', 'gameoflife.gamepython:GamePythonLazy')
+register('flat', 'gameoflife.gamepython:GamePythonFlat')
+register('numpy', 'gameoflife.gamenumpy:GameNumPy', ('numpy',))
+register('numpy-light', 'gameoflife.gamenumpy:GameNumPyLight', ('numpy',),
+         full=False)
+register('numpy-lazy', 'gameoflife.gamenumpy:GameNumPyLazy', ('numpy',))
+register('numba', 'gameoflife.gamenumba:GameNumba', ('numpy',))
+register('memmap', 'gameoflife.gamememmap:GameMemmap', ('numpy',),
+         full=False)
+register('tiled', 'gameoflife.gametiled:GameTiled', ('numpy',), full=False)
+register('distributed', 'gameoflife.distributed:GameDistributed', ('numpy',),
+         full=False)
+
+
+def cache_path():
+    """Returns the path of the calibration cache file."""
+    cache_dir = os.environ.get('XDG_CACHE_HOME',
+                               os.path.join(os.path.expanduser('~'),
+                                            '.cache'))
+    return os.path.join(cache_dir, 'gameoflife', 'calibration.json')
+
+
+def calibration_key(width, height, prob):
+    """Returns the calibration cache key for a job: host, grid size and
+    density bucket (tenths of probability).
+    """
+    import socket
+    return '{}:{}x{}:p{:.1f}'.format(socket.gethostname(), width, height,
+                                     round(prob * 10) / 10)
+
+
+def measure(cls, width, height, prob, budget=CALIBRATION_BUDGET):
+    """Returns the average time taken by an engine to compute a generation
+    and query a viewport-sized region.
+    """
+    game = cls(width, height)
+    game.populate_random(prob)
+
+    # The first generation may include one-time costs (e.g. compilation)
+    game.next_generation()
+
+    count = 0
+    start = time.time()
+    elapsed = 0.0
+    while count == 0 or elapsed < budget:
+        game.next_generation()
+        game.region(0, 0, min(VIEWPORT_HEIGHT, height),
+                    min(VIEWPORT_WIDTH, width))
+        count += 1
+        elapsed = time.time() - start
+
+    if hasattr(game, 'close'):
+        game.close()
+    return elapsed / count
+
+
+def calibrate(width, height, prob, budget=CALIBRATION_BUDGET):
+    """Measures all available full-featured engines at the specified size
+    and density. Returns a dict of engine names to times per generation.
+
+    Each engine is first measured on a small grid, and skipped if its
+    estimate at the requested size is ten times slower than an engine
+    already measured at that size.
+    """
+    timings = {}
+    candidates = [engine for engine in map(get, names())
+                  if engine.full and engine.available()]
+
+    # Estimate the cost of each engine
+    estimates = {}
+    size = min(ESTIMATE_SIZE, width), min(ESTIMATE_SIZE, height)
+    scale = (width * height) / (size[0] * size[1])
+    for engine in candidates:
+        estimates[engine.name] = measure(engine.load(), size[0], size[1],
+                                         prob, budget / 10) * scale
+
+    # Measure the most promising engines at the requested size
+    for engine in sorted(candidates, key=lambda e: estimates[e.name]):
+        if timings and estimates[engine.name] > 10 * min(timings.values()):
+            continue
+        timings[engine.name] = measure(engine.load(), width, height, prob,
+                                       budget)
+
+    return timings
+
+
+def select_engine(width, height, prob, path=None):
+    """Returns the name of the fastest full-featured engine for the
+    specified size and density.
+
+    The result is cached on disk, so that calibration only happens once per
+    host, grid size and density bucket.
+    """
+    path = path or cache_path()
+    key = calibration_key(width, height, prob)
+
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (IOError, OSError, ValueError):
+        cache = {}
+
+    entry = cache.get(key)
+    if entry is not None and entry['engine'] in names() \
+            and get(entry['engine']).available():
+        return entry['engine']
+
+    timings = calibrate(width, height, prob)
+    best = min(timings, key=timings.get)
+    cache[key] = {'engine': best, 'timings': timings, 'time': time.time()}
+
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+    except (IOError, OSError):
+        # Not being able to cache the result is not fatal
+        pass
+
+    return best
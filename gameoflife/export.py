@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides an exporter that renders the frames of a game to
+images, either a sequence of PNG files or an animated GIF, without any UI.
+
+Frames are rendered from the fates and ages of the cells with the colors of
+the curses UI, and encoded in the background while the game goes on. Both
+formats are encoded with the standard library only.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import zlib
+from argparse import ArgumentParser
+from collections import deque
+
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue
+
+import numpy as np
+
+from gameoflife import engines
+from gameoflife.ages import age_buckets
+from gameoflife.gameoflife import Fate
+
+
+"""Colors of the frames, as RGB triplets: dead cells, then live cells in each
+age bucket (yellow, green, cyan and white, as in the UI). The palette is
+padded to a power of 2, as GIF requires.
+"""
+PALETTE = np.array([[0, 0, 0],
+                    [255, 255, 0],
+                    [0, 255, 0],
+                    [0, 255, 255],
+                    [255, 255, 255],
+                    [0, 0, 0],
+                    [0, 0, 0],
+                    [0, 0, 0]], dtype=np.uint8)
+
+"""Whether a cell with a given fate is currently alive."""
+LIVE_FATES = np.zeros(5, dtype=np.uint8)
+LIVE_FATES[[Fate.Survive, Fate.DeathByIsolation,
+            Fate.DeathByOvercrowding]] = 1
+
+
+def render(fates, ages, scale=1):
+    """Returns the palette indexes of the pixels of a frame, with scale x
+    scale pixels per cell.
+    """
+    pixels = (LIVE_FATES[np.asarray(fates)] *
+              (1 + age_buckets(np.asarray(ages)))).astype(np.uint8)
+    if scale > 1:
+        pixels = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
+    return pixels
+
+
+def _png_chunk(kind, data):
+    """Returns a PNG chunk."""
+    return (struct.pack('!I', len(data)) + kind + data +
+            struct.pack('!I', zlib.crc32(kind + data) & 0xffffffff))
+
+
+def encode_png(pixels, palette=PALETTE):
+    """Encodes palette indexes as an indexed-color PNG image."""
+    height, width = pixels.shape
+
+    # Each row starts with its filter type (0: none)
+    rows = np.zeros((height, width + 1), dtype=np.uint8)
+    rows[:, 1:] = pixels
+
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', struct.pack('!IIBBBBB', width, height, 8, 3, 0,
+                                        0, 0)),
+        _png_chunk(b'PLTE', palette.tobytes()),
+        _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)),
+        _png_chunk(b'IEND', b'')])
+
+
+def lzw_compress(data, min_code_size):
+    """Compresses bytes with the variable-length LZW flavor used by GIF."""
+    clear = 1 << min_code_size
+    next_code = clear + 2
+    code_size = min_code_size + 1
+    table = {}
+
+    out = bytearray()
+    bits, bit_count = clear, code_size  # the stream starts with a clear code
+
+    data = bytearray(data)
+    prefix = data[0]
+    for value in data[1:]:
+        key = prefix << 8 | value
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+
+        # Output the longest known string
+        bits |= prefix << bit_count
+        bit_count += code_size
+        while bit_count >= 8:
+            out.append(bits & 0xff)
+            bits >>= 8
+            bit_count -= 8
+
+        # The decoder widens its codes one code late
+        if next_code >= 1 << code_size and code_size < 12:
+            code_size += 1
+
+        if next_code < 4096:
+            table[key] = next_code
+            next_code += 1
+        else:
+            # Table full: start over
+            bits |= clear << bit_count
+            bit_count += code_size
+            table.clear()
+            next_code = clear + 2
+            code_size = min_code_size + 1
+        prefix = value
+
+    # Last string, and end of information code
+    for code in (prefix, clear + 1):
+        bits |= code << bit_count
+        bit_count += code_size
+        if code == prefix and next_code >= 1 << code_size and code_size < 12:
+            code_size += 1
+    while bit_count > 0:
+        out.append(bits & 0xff)
+        bits >>= 8
+        bit_count -= 8
+
+    return bytes(out)
+
+
+class GifWriter(object):
+    """Writes an animated GIF, one frame at a time."""
+
+    def __init__(self, path, width, height, delay=10, palette=PALETTE):
+        """Creates the file. delay is the duration of each frame, in
+        hundredths of a second.
+        """
+        self.width, self.height, self.delay = width, height, delay
+        self.min_code_size = max(2, int(np.log2(len(palette))))
+        self.file = open(path, 'wb')
+
+        # Header, logical screen with the global color table, and looping
+        # extension
+        self.file.write(b'GIF89a' + struct.pack(
+            '<HHBBB', width, height, 0xf0 | (self.min_code_size - 1), 0, 0))
+        self.file.write(palette.tobytes())
+        self.file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+    def write(self, pixels):
+        """Writes a frame of palette indexes."""
+        self.write_compressed(lzw_compress(pixels.tobytes(),
+                                           self.min_code_size))
+
+    def write_compressed(self, data):
+        """Writes a frame compressed with lzw_compress() and the writer's
+        min_code_size.
+        """
+        # Graphic control extension (frame duration), image descriptor, and
+        # the data in sub-blocks of up to 255 bytes
+        parts = [struct.pack('<BBBBHBB', 0x21, 0xf9, 4, 0, self.delay, 0, 0),
+                 struct.pack('<BHHHHB', 0x2c, 0, 0, self.width, self.height,
+                             0),
+                 struct.pack('B', self.min_code_size)]
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            parts.append(struct.pack('B', len(block)) + block)
+        parts.append(b'\x00')
+        self.file.write(b''.join(parts))
+
+    def close(self):
+        """Writes the trailer and closes the file."""
+        self.file.write(b'\x3b')
+        self.file.close()
+
+
+class FrameExporter(object):
+    """Exports frames of a game to images.
+
+    path is either a GIF file, or a pattern of PNG files formatted with the
+    generation number, e.g. 'frames/{:06d}.png'. Frames can be restricted to
+    a region, as (row, col, height, width), and only one generation out of
+    every is exported.
+
+    Frames are rendered when add() is called, and encoded and written by a
+    background thread. zlib doesn't hold the GIL, so the thread encodes PNG
+    files itself, but GIF frames are compressed in pure Python, by a pool of
+    processes (one per CPU by default). If the encoders fall behind, add()
+    waits for them, so that no frame is ever dropped.
+    """
+
+    # Frames waiting to be encoded before add() waits for the encoder
+    QUEUE_SIZE = 16
+
+    def __init__(self, path, scale=1, every=1, region=None, fps=10.0,
+                 processes=None):
+        """Creates a new exporter."""
+        self.path = path
+        self.scale = scale
+        self.every = every
+        self.region = region
+        self.fps = fps
+        self.gif = path.lower().endswith('.gif')
+        self.frames = 0  # number of frames exported
+
+        self._count = 0  # number of calls to add()
+        self._writer = None
+        self._error = None
+        self._queue = queue.Queue(self.QUEUE_SIZE)
+
+        # The processes are spawned rather than forked, as forking a process
+        # that runs threads (e.g. Numba's) can deadlock
+        self.processes = processes or multiprocessing.cpu_count()
+        self._pool = None
+        if self.gif:
+            if hasattr(multiprocessing, 'get_context'):
+                context = multiprocessing.get_context('spawn')
+            else:
+                # Python 2
+                context = multiprocessing
+            self._pool = context.Pool(self.processes)
+
+        self._thread = threading.Thread(target=self._encode)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, game):
+        """Exports the current generation of a game, unless it is skipped."""
+        self._count += 1
+        if (self._count - 1) % self.every:
+            return
+        if self._error is not None:
+            raise self._error
+
+        region = self.region or (0, 0, game.height, game.width)
+        fates, ages = game.region(*region)
+        self._queue.put((game.generation, render(fates, ages, self.scale)))
+        self.frames += 1
+
+    def close(self):
+        """Waits for the pending frames to be written."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+        if self._writer is not None:
+            self._writer.close()
+        if self._error is not None:
+            raise self._error
+
+    def _encode(self):
+        """Encodes and writes the frames, in the background thread."""
+
+        # GIF frames being compressed, in order
+        pending = deque()
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                # Keep emptying the queue, so that add() doesn't block
+                continue
+            generation, pixels = item
+            try:
+                if self.gif:
+                    if self._writer is None:
+                        self._writer = GifWriter(
+                            self.path, pixels.shape[1], pixels.shape[0],
+                            int(round(100 / self.fps)))
+                    pending.append(self._pool.apply_async(
+                        lzw_compress, (pixels.tobytes(),
+                                       self._writer.min_code_size)))
+
+                    # Write the frames that are done, waiting for the oldest
+                    # one if there are too many in flight
+                    while pending and (pending[0].ready() or
+                                       len(pending) > 2 * self.processes):
+                        self._writer.write_compressed(pending.popleft().get())
+                else:
+                    with open(self.path.format(generation), 'wb') as f:
+                        f.write(encode_png(pixels))
+            except Exception as e:
+                self._error = e
+
+        try:
+            while pending and self._error is None:
+                self._writer.write_compressed(pending.popleft().get())
+        except Exception as e:
+            self._error = e
+
+
+def main():
+    """Entry point for gameoflife-export."""
+    parser = ArgumentParser(prog='gameoflife-export',
+                            description='Renders a Game of Life run to '
+                                        'images',
+                            add_help=False)
+    parser.add_argument('output', type=str,
+                        help='GIF file, or pattern of PNG files formatted '
+                             'with the generation, e.g. frames/{:06d}.png')
+    parser.add_argument('--impl', '-i', type=str, default='numpy',
+                        help='game implementation (default: numpy)')
+    parser.add_argument('--width', '-w', type=int, default=100,
+                        help='grid width')
+    parser.add_argument('--height', '-h', type=int, default=100,
+                        help='grid height')
+    parser.add_argument('--prob', '-p', type=float, default=0.5,
+                        help='initial population probability')
+    parser.add_argument('--seed', '-s', type=int, default=0,
+                        help='random seed (default: 0)')
+    parser.add_argument('--generations', '-g', type=int, default=100,
+                        help='number of generations (default: 100)')
+    parser.add_argument('--every', '-e', type=int, default=1,
+                        help='export one generation out of EVERY')
+    parser.add_argument('--scale', type=int, default=4,
+                        help='pixels per cell, on each axis (default: 4)')
+    parser.add_argument('--region', '-r', type=str, default=None,
+                        help='exported region, as ROW,COL,HEIGHT,WIDTH '
+                             '(default: whole grid)')
+    parser.add_argument('--fps', type=float, default=10.0,
+                        help='GIF frames per second (default: 10)')
+    parser.add_argument('--help', action='help',
+                        help='show this help message and exit')
+    args = parser.parse_args()
+
+    try:
+        engine = engines.get(args.impl)
+    except KeyError:
+        parser.error('unknown implementation {} (choose from {})'
+                     .format(args.impl, ', '.join(engines.names())))
+    for module in engine.missing():
+        parser.error("can't find {0} module. "
+                     "Check if it is installed correctly.".format(module))
+
+    region = None
+    if args.region is not None:
+        try:
+            region = tuple(int(value) for value in args.region.split(','))
+        except ValueError:
+            region = ()
+        if len(region) != 4:
+            parser.error('region needs to be ROW,COL,HEIGHT,WIDTH')
+    if args.every <= 0 or args.scale <= 0:
+        parser.error('every and scale need to be positive integers')
+
+    output = args.output
+    if not output.lower().endswith('.gif') and '{' not in output:
+        root, ext = os.path.splitext(output)
+        output = root + '{:06d}' + (ext or '.png')
+    directory = os.path.dirname(output)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # The same seed always gives the same run
+    game = engine.load()(args.width, args.height)
+    game.populate_random(args.prob, args.seed)
+
+    start = time.time()
+    with FrameExporter(output, args.scale, args.every, region,
+                       args.fps) as exporter:
+        for _ in range(args.generations):
+            exporter.add(game)
+            game.next_generation()
+    elapsed = time.time() - start
+
+    print('{} frames written in {:.2f} s ({:.1f} generations/s)'
+          .format(exporter.frames, elapsed, args.generations / elapsed))
+
+
+if __name__ == '__main__':
+    main()
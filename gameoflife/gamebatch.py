@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides a class that runs a batch of independent games of
+the Game of Life at once, using the NumPy library.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import numpy as np
+
+from gameoflife.populate import RandomCells
+
+
+class GameNumPyBatch(object):
+    """Batch of independent games of the Game of Life, all of the same size.
+
+    The cells of all universes are held in a single (batch, height, width)
+    array and every generation is computed for the whole batch at once, each
+    universe wrapping around the edges of its own torus. Universes that
+    stabilize (i.e. come back to one of their last max_period states) drop
+    out of the batch, so that later generations only cost the remaining
+    ones.
+    """
+
+    def __init__(self, batch, width, height, max_period=2):
+        """Creates a new batch of games."""
+        self.batch, self.width, self.height = batch, width, height
+        self.max_period = max_period
+        self.generation = 1
+        self._init()
+
+    def _init(self):
+        """Initializes the internal structures used by the batch."""
+        shape = (self.batch, self.height, self.width)
+
+        # States ring. The current states of the universes still in the batch
+        # are in slot _current, the previous ones in the slots before it
+        # (modulo the ring size). Each item is either 0 for a dead cell or 1
+        # for a live one.
+        self._states = np.zeros((self.max_period + 1,) + shape, dtype=np.uint8)
+        self._current = 0
+
+        # Original indexes of the universes still in the batch
+        self.ids = np.arange(self.batch)
+
+        # Results, indexed by original universe index. The period is 0 for
+        # universes that haven't stabilized yet.
+        self.populations = np.zeros(self.batch, dtype=np.int64)
+        self.periods = np.zeros(self.batch, dtype=np.int64)
+        self.stabilized_at = np.zeros(self.batch, dtype=np.int64)
+
+        # Preallocated buffers for the computation of generations
+        self._padded = np.zeros((self.batch, self.height + 2,
+                                 self.width + 2), dtype=np.uint8)
+        self._neighbors = np.zeros(shape, dtype=np.uint8)
+        self._mask = np.zeros(shape, dtype=bool)
+
+    def reset(self):
+        """Resets the batch."""
+        self.generation = 1
+        self._init()
+
+    @property
+    def cells(self):
+        """Cells of the universes still in the batch, as a (active, height,
+        width) array.
+        """
+        return self._states[self._current][:len(self.ids)]
+
+    @property
+    def active(self):
+        """Number of universes still in the batch."""
+        return len(self.ids)
+
+    def populate_random(self, prob=0.5, seed=None):
+        """Populates the grids of cells at random, with specified
+        probability. prob is either a single probability for all universes,
+        or a sequence with one probability per universe. If a seed is given,
+        each universe gets the grid of a single game populated with the seed
+        plus the universe's index (see populate.RandomCells).
+        """
+        probs = np.broadcast_to(np.asarray(prob, dtype=np.float64),
+                                (self.batch,))
+
+        # Start a new run with all the universes, forgetting the results of
+        # the previous one. Previous states in the ring are ignored until
+        # overwritten, since the generation starts over.
+        self.generation = 1
+        self._current = 0
+        self.ids = np.arange(self.batch)
+        self.periods.fill(0)
+        self.stabilized_at.fill(0)
+
+        cells = self.cells
+        for idx in range(self.batch):
+            RandomCells(probs[idx], None if seed is None else seed + idx) \
+                .fill(cells[idx])
+        self.populations[self.ids] = cells.sum(axis=(1, 2))
+
+    def next_generation(self):
+        """Triggers the next generation of cells in all universes still in
+        the batch, and increments generation.
+        """
+        self._step()
+        self.generation += 1
+        self._drop_stabilized()
+
+    def run(self, max_generations):
+        """Advances the batch until all universes have stabilized, or until
+        the specified generation is reached.
+        """
+        while self.active and self.generation < max_generations:
+            self.next_generation()
+
+    def _step(self):
+        """Computes the next generation of cells based on the current one."""
+        active = len(self.ids)
+        cells = self.cells
+
+        # Copy the cells into the padded buffer, with a one-cell margin that
+        # wraps around the edges of each torus
+        padded = self._padded[:active]
+        padded[:, 1:-1, 1:-1] = cells
+        padded[:, 0, 1:-1] = cells[:, -1]
+        padded[:, -1, 1:-1] = cells[:, 0]
+        padded[:, :, 0] = padded[:, :, -2]
+        padded[:, :, -1] = padded[:, :, 1]
+
+        # Count the neighbors by summing the eight shifted views of the
+        # padded cells
+        neighbors = self._neighbors[:active]
+        neighbors.fill(0)
+        for drow in range(3):
+            for dcol in range(3):
+                if (drow, dcol) != (1, 1):
+                    neighbors += padded[:, drow:drow + self.height,
+                                        dcol:dcol + self.width]
+
+        # New live cells are the cells with exactly 3 neighbors, and the
+        # live cells with exactly 2 neighbors. They overwrite the oldest
+        # states in the ring.
+        self._current = (self._current + 1) % len(self._states)
+        new_cells = self.cells
+        mask = self._mask[:active]
+        np.equal(neighbors, 2, out=mask)
+        np.logical_and(mask, cells, out=mask)
+        np.equal(neighbors, 3, out=new_cells, casting='unsafe')
+        np.logical_or(new_cells, mask, out=new_cells, casting='unsafe')
+
+    def _drop_stabilized(self):
+        """Records the universes that have come back to one of their previous
+        states, and removes them from the batch.
+        """
+        cells = self.cells
+        self.populations[self.ids] = cells.sum(axis=(1, 2))
+
+        # Compare the new states to the previous ones, starting with the
+        # shortest period
+        periods = np.zeros(len(self.ids), dtype=np.int64)
+        for period in range(1, min(self.max_period, self.generation - 1) + 1):
+            slot = (self._current - period) % len(self._states)
+            previous = self._states[slot][:len(self.ids)]
+            same = (cells == previous).all(axis=(1, 2))
+            periods[same & (periods == 0)] = period
+
+        stabilized = periods != 0
+        if not stabilized.any():
+            return
+
+        self.periods[self.ids[stabilized]] = periods[stabilized]
+        self.stabilized_at[self.ids[stabilized]] = self.generation
+
+        # Compact the states of the remaining universes at the beginning of
+        # each slot of the ring
+        keep = np.logical_not(stabilized)
+        remaining = int(keep.sum())
+        for slot in range(len(self._states)):
+            states = self._states[slot]
+            states[:remaining] = states[:len(self.ids)][keep]
+        self.ids = self.ids[keep]
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides a class that implements the Game of Life on grids
+kept on disk, using NumPy memory-mapped files.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from gameoflife.gameoflife import GameOfLife, Snapshot
+from gameoflife.gamenumpy import BaseGameNumPy
+from gameoflife.populate import RandomCells
+
+
+class GameMemmap(GameOfLife):
+    """Out-of-core implementation of the Game of Life.
+
+    The grid of cells is kept in a file on disk, one byte per cell, and each
+    generation is computed by streaming stripes of rows through memory into a
+    second file, which then swaps roles with the first one. Memory usage is
+    bounded by max_memory (in bytes), whatever the size of the grid.
+
+    Like the light implementations, it does not keep track of the fates and
+    ages of the cells. Fates are derived on demand for the requested region.
+    """
+
+    # Default bound on the memory used to compute a generation
+    DEFAULT_MAX_MEMORY = 64 * 1024 * 1024
+
+    # Bytes of stripe buffers needed per cell of a stripe
+    STRIPE_BYTES_PER_CELL = 4
+
+    def __init__(self, width, height, directory=None,
+                 max_memory=DEFAULT_MAX_MEMORY):
+        """Creates a new instance of the Game of Life, keeping its grids in
+        the specified directory (by default, the system's temporary
+        directory).
+        """
+        self.directory = directory
+        self.max_memory = max_memory
+        self._paths = []
+        super(GameMemmap, self).__init__(width, height)
+
+    def _init(self):
+        """Initializes the internal structures used by the implementation."""
+
+        # The two on-disk buffers. Each byte is either 0 for a dead cell or 1
+        # for a live one. Truncating the files fills them with zeros, without
+        # allocating disk space until actually written on most filesystems.
+        if not self._paths:
+            for _ in range(2):
+                fd, path = tempfile.mkstemp(prefix='gameoflife-',
+                                            suffix='.cells',
+                                            dir=self.directory)
+                os.close(fd)
+                self._paths.append(path)
+        for path in self._paths:
+            with open(path, 'r+b') as f:
+                f.truncate(0)
+                f.truncate(self.width * self.height)
+        self._src, self._dst = 0, 1
+
+        # Number of rows per stripe, according to the memory bound
+        row_bytes = (self.width + 2) * self.STRIPE_BYTES_PER_CELL
+        self.stripe_rows = max(1, min(self.height,
+                                      self.max_memory // row_bytes - 2))
+
+        # Stripe buffers: the stripe's cells with a one-cell margin, the
+        # number of neighbors of each cell and the new cells
+        self._padded = np.zeros((self.stripe_rows + 2, self.width + 2),
+                                dtype=np.uint8)
+        self._neighbors = np.zeros((self.stripe_rows, self.width),
+                                   dtype=np.uint8)
+        self._new_cells = np.zeros((self.stripe_rows, self.width),
+                                   dtype=np.uint8)
+
+    def close(self):
+        """Deletes the on-disk buffers."""
+        for path in self._paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self._paths = []
+
+    def __del__(self):
+        self.close()
+
+    def _map(self, buf, start, stop, mode='r'):
+        """Maps the rows from start (included) to stop (excluded) of one of
+        the on-disk buffers. Rows must not wrap around.
+        """
+        return np.memmap(self._paths[buf], dtype=np.uint8, mode=mode,
+                         offset=start * self.width,
+                         shape=(stop - start, self.width))
+
+    def _read_rows(self, buf, start, stop, out, cols=None):
+        """Reads the rows from start (included) to stop (excluded) of one of
+        the on-disk buffers into out, wrapping around the edges of the torus.
+        If cols is given, only reads these columns.
+        """
+        row = start
+        while row < stop:
+            # Read up to the end of the buffer, or up to stop, at most a
+            # stripe at a time
+            first = row % self.height
+            count = min(stop - row, self.height - first, self.stripe_rows)
+            rows = self._map(buf, first, first + count)
+            out[row - start:row - start + count] = \
+                rows if cols is None else rows[:, cols]
+            del rows
+            row += count
+
+    @property
+    def cells(self):
+        """Read-only mapping of the current grid of cells."""
+        return np.memmap(self._paths[self._src], dtype=np.uint8, mode='r',
+                         shape=(self.height, self.width))
+
+    def populate_random(self, prob=0.5, seed=None):
+        """Populates the grid of cells at random, with specified
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
+        """
+
+        # The cells are drawn directly into the mapped stripes, one band of
+        # random data at a time
+        source = RandomCells(prob, seed)
+        for start in range(0, self.height, self.stripe_rows):
+            stop = min(start + self.stripe_rows, self.height)
+            rows = self._map(self._src, start, stop, mode='r+')
+            source.fill(rows, start)
+            del rows
+
+    def set_cell(self, row, col, alive=True):
+        """Sets the state of the cell at the specified location."""
+        row, col = row % self.height, col % self.width
+        rows = self._map(self._src, row, row + 1, mode='r+')
+        rows[0, col] = 1 if alive else 0
+        del rows
+
+    def fork(self):
+        """Returns an independent copy of the game, e.g. to run variants of
+        it from the current generation. The copy has its own on-disk
+        buffers, in the same directory.
+        """
+        game = type(self)(self.width, self.height, self.directory,
+                          self.max_memory)
+        game.generation = self.generation
+        shutil.copyfile(self._paths[self._src], game._paths[game._src])
+        return game
+
+    def _step(self):
+        """Computes the next generation of cells based on the current one."""
+        for start in range(0, self.height, self.stripe_rows):
+            stop = min(start + self.stripe_rows, self.height)
+            self._step_stripe(start, stop)
+
+        # The new grid becomes the current one
+        self._src, self._dst = self._dst, self._src
+
+    def _step_stripe(self, start, stop):
+        """Computes the next generation of a stripe of rows."""
+        count = stop - start
+
+        # Read the stripe with one row of margin on each side. The first and
+        # last stripes get their margins from the other side of the torus.
+        padded = self._padded[:count + 2]
+        self._read_rows(self._src, start - 1, stop + 1, padded[:, 1:-1])
+        padded[:, 0] = padded[:, -2]
+        padded[:, -1] = padded[:, 1]
+
+        # Count the neighbors by summing the eight shifted views of the
+        # padded stripe
+        neighbors = self._neighbors[:count]
+        neighbors.fill(0)
+        for drow in range(3):
+            for dcol in range(3):
+                if (drow, dcol) != (1, 1):
+                    neighbors += padded[drow:drow + count,
+                                        dcol:dcol + self.width]
+
+        # New live cells are the cells with exactly 3 neighbors, and the
+        # live cells with exactly 2 neighbors
+        new_cells = self._new_cells[:count]
+        np.equal(neighbors, 2, out=new_cells, casting='unsafe')
+        new_cells &= padded[1:-1, 1:-1]
+        new_cells |= neighbors == 3
+
+        rows = self._map(self._dst, start, stop, mode='r+')
+        rows[...] = new_cells
+        del rows
+
+    def _snapshot(self):
+        """Returns a Snapshot of the current state of the game, with a
+        read-only mapping of the cells.
+        """
+        return Snapshot(self.generation, self.cells, None, None, None)
+
+    def fate(self, row, col):
+        """Returns the fate of the cell at the specified location."""
+        fates, _ = self.region(row, col, 1, 1)
+        return fates[0, 0]
+
+    def age(self, row, col):
+        """Returns the age of a cell, i.e. how many generations it's been in
+        its current state (dead or alive).
+        """
+
+        # The memmap implementation does not know the ages, so it cheats and
+        # returns a constant value.
+        return 1000
+
+    def block_population(self, row, col, height, width, zoom):
+        """Returns the number of live cells in each zoom x zoom block of the
+        specified region, as an array indexed by [row, col] of the block.
+        """
+
+        # Read the region one row of blocks at a time, a few rows at a time
+        # into the stripe buffer so as to stay within the memory bound, and
+        # sum the rows of each block first
+        cols = np.arange(col, col + width * zoom)
+        lines = self._new_cells
+        sums = np.zeros(self.width, dtype=np.int32)
+        blocks = np.zeros((height, width), dtype=np.int32)
+        for block_row in range(height):
+            sums.fill(0)
+            start = row + block_row * zoom
+            for first in range(start, start + zoom, self.stripe_rows):
+                stop = min(first + self.stripe_rows, start + zoom)
+                self._read_rows(self._src, first, stop, lines)
+                sums += lines[:stop - first].sum(axis=0, dtype=np.int32)
+            blocks[block_row] = sums.take(cols, mode='wrap').reshape(
+                width, zoom).sum(axis=1)
+        return blocks
+
+    def region(self, row, col, height, width):
+        """Returns the fates and ages of the cells in the specified region, as
+        a pair of arrays indexed by [row, col] relative to the region's top
+        left corner. The region wraps around the edges of the torus.
+        """
+
+        # Read the region with a one-cell margin, so that the neighbors of the
+        # cells on the region's edges are known. Only the region's columns
+        # are read, whatever the width of the grid.
+        window = np.zeros((height + 2, width + 2), dtype=np.uint8)
+        cols = np.arange(col - 1, col + width + 1) % self.width
+        self._read_rows(self._src, row - 1, row + height + 1, window, cols)
+
+        fates = BaseGameNumPy._fates_from_window(window)
+        ages = np.empty((height, width), dtype=np.int64)
+        ages.fill(1000)
+
+        return fates, ages
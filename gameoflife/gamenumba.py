@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides a class that implements the Game of Life using
+Numba-compiled loops, when Numba is installed.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from gameoflife.gameoflife import Fate
+from gameoflife.gamenumpy import GameNumPy
+
+
+"""Whether the compiled step is available."""
+HAVE_NUMBA = numba is not None
+
+"""Whether a cell with a given fate is alive in the next generation."""
+LIVE_FATES = np.zeros(5, dtype=np.int8)
+LIVE_FATES[Fate.Birth] = LIVE_FATES[Fate.Survive] = 1
+
+"""Fate of a cell, indexed by its number of live neighbors plus 9 if it is
+alive.
+"""
+RULE_FATES = np.array([Fate.StayDead, Fate.StayDead, Fate.StayDead,
+                       Fate.Birth, Fate.StayDead, Fate.StayDead,
+                       Fate.StayDead, Fate.StayDead, Fate.StayDead,
+                       Fate.DeathByIsolation, Fate.DeathByIsolation,
+                       Fate.Survive, Fate.Survive,
+                       Fate.DeathByOvercrowding, Fate.DeathByOvercrowding,
+                       Fate.DeathByOvercrowding, Fate.DeathByOvercrowding,
+                       Fate.DeathByOvercrowding], dtype=np.int8)
+
+
+if HAVE_NUMBA:
+    @numba.njit(parallel=True, cache=True)
+    def fused_step(cells, fates, new_fates, ages, live_fates, rule_fates):
+        """Applies the fates to all cells and computes their new fates, in a
+        single pass. Rows are processed in parallel.
+
+        The new state of each neighbor is read from its current fate, so the
+        fates computed for the next generation go into new_fates.
+        """
+        height, width = cells.shape
+        for row in numba.prange(height):
+            up, down = (row - 1) % height, (row + 1) % height
+
+            # Number of live cells in each column of the three rows, with a
+            # one-column margin that wraps around the edges of the torus, so
+            # that the loop below needs no modulo operations
+            sums = np.empty(width + 2, dtype=np.int8)
+            for col in range(width):
+                sums[col + 1] = (live_fates[fates[up, col]] +
+                                 live_fates[fates[row, col]] +
+                                 live_fates[fates[down, col]])
+            sums[0], sums[width + 1] = sums[width], sums[1]
+
+            for col in range(width):
+                # Apply the fate of the cell
+                alive = live_fates[fates[row, col]]
+                if alive == cells[row, col]:
+                    ages[row, col] += 1
+                else:
+                    ages[row, col] = 0
+                cells[row, col] = alive
+
+                # Count the neighbors that will be alive: the 3x3 block
+                # around the cell, minus the cell itself
+                num_neighbors = (sums[col] + sums[col + 1] + sums[col + 2] -
+                                 alive)
+                new_fates[row, col] = rule_fates[num_neighbors + 9 * alive]
+
+
+class GameNumba(GameNumPy):
+    """Full-featured Numba-based implementation of the Game of Life.
+
+    Each generation is computed by a single compiled loop over the cells,
+    which applies the current fates, updates the ages and computes the next
+    fates. Compilation results are cached on disk by Numba. If Numba is not
+    installed, this is the same as the NumPy implementation.
+    """
+
+    BUFFERS = GameNumPy.BUFFERS + ('_new_fates',)
+
+    def _init_buffers(self):
+        """Initializes the buffers used to compute generations."""
+        super(GameNumba, self)._init_buffers()
+
+        # The next fates are computed into this array, and swapped with the
+        # current ones at each generation
+        self._new_fates = np.zeros((self.height, self.width), dtype=np.int8)
+
+    def _step(self):
+        """Computes the next generation of cells based on the current one."""
+        if not HAVE_NUMBA:
+            super(GameNumba, self)._step()
+            return
+
+        fused_step(self._own('cells'), self.fates, self._new_fates,
+                   self._own('ages'), LIVE_FATES, RULE_FATES)
+        self._swap('fates', '_new_fates')
+
+    def _flips(self):
+        """Returns the mask of the cells that changed state at the last
+        generation, or None if it was computed by the compiled loop, which
+        doesn't keep it.
+        """
+        if not HAVE_NUMBA:
+            return super(GameNumba, self)._flips()
+        return None
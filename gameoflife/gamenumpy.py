@@ -15,43 +15,433 @@
 # included in all copies or substantial portions of the Software.
 
 """This module provides a class that implements the Game of Life using
-the NumPy and SciPy libraries.
+the NumPy library, and optionally SciPy.
 """
 
 from __future__ import (division, absolute_import, print_function,
                         unicode_literals)
 
+import copy
+
 import numpy as np
-from scipy.ndimage.filters import convolve
 
-from gameoflife.gameoflife import GameOfLife, Fate
+from gameoflife.gameoflife import GameOfLife, Fate, Snapshot
+from gameoflife.populate import RandomCells
+
+
+"""Fate of a cell, indexed by its value in the convolved matrix of neighbors
+(see BaseGameNumPy._fates_from_convolved).
+"""
+CONVOLVED_FATES = np.array([Fate.StayDead] * 3 + [Fate.Birth] +
+                           [Fate.StayDead] * 6 +
+                           [Fate.DeathByIsolation] * 2 +
+                           [Fate.Survive] * 2 +
+                           [Fate.DeathByOvercrowding] * 5, dtype=np.int8)
+
+
+def readonly(array):
+    """Returns a read-only view of an array, or None if array is None."""
+    if array is None:
+        return None
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class StateArray(object):
+    """Descriptor of a state array of a NumPy game (see BaseGameNumPy.STATE).
+
+    Cells changed in a state array shared with forks are kept aside by the
+    game, and only applied to a private copy of the array when the array
+    itself is read (see BaseGameNumPy._write).
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, game, owner=None):
+        if game is None:
+            return self
+        if game.__dict__.get('_changes', {}).get(self.name):
+            return game._own(self.name)
+        try:
+            return game.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+    def __set__(self, game, value):
+        game.__dict__[self.name] = value
 
 
 class BaseGameNumPy(GameOfLife):
-    """Base class for both Numpy/SciPy implementations."""
+    """Base class for all NumPy implementations."""
 
     # Weights used for the convolve operation
     WEIGHTS = np.array([[1, 1,  1],
                         [1, 10, 1],
                         [1, 1,  1]])
 
+    # Whether to use SciPy's convolve operation instead of the NumPy-only
+    # stencil. Both give the same results, but importing SciPy is slow.
+    use_scipy = False
+
+    # Names of the arrays holding the state of the game, as opposed to the
+    # buffers. Forks share them until they write to them (see fork).
+    STATE = ('cells',)
+    cells = StateArray('cells')
+
+    # Names of the buffers allocated by _init_buffers. Forks only allocate
+    # them when they first use them (see __getattr__).
+    BUFFERS = ('_padded', '_row_sums', '_con', '_mask')
+
     def _init(self):
         """Initializes the internal structures used by the implementation."""
 
         # Cells grid. Each item is either 0 for a dead cell or 1 for a live
         # one.
-        self.cells = np.zeros((self.width, self.height), dtype=np.int8)
-
-    def populate_random(self, prob=0.5):
+        self.cells = np.zeros((self.height, self.width), dtype=np.int8)
+
+        # Names of the state arrays shared with forks of the game, and cells
+        # changed in them but not copied yet, as {name: {(row, col): value}}
+        self._shared = set()
+        self._changes = {}
+
+        self._init_buffers()
+
+    def __getattr__(self, name):
+        # Only called for missing attributes, i.e. the buffers of a fork that
+        # hasn't used them yet
+        if name in type(self).BUFFERS:
+            self._init_buffers()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    def _init_buffers(self):
+        """Initializes the buffers used to compute generations."""
+
+        # Buffers for the convolve operation: the cells with a one-cell
+        # margin that wraps around the edges, the sums of each row of three
+        # cells, and the convolved matrix itself
+        self._padded = np.zeros((self.height + 2, self.width + 2),
+                                dtype=np.int8)
+        self._row_sums = np.zeros((self.height + 2, self.width),
+                                  dtype=np.int8)
+        self._con = np.zeros((self.height, self.width), dtype=np.int8)
+        self._mask = np.zeros((self.height, self.width), dtype=bool)
+
+        # Summed-area table of the cells, built on demand (see
+        # _summed_area), and the generation it was built for
+        self._sat = None
+        self._sat_generation = None
+
+    def populate_random(self, prob=0.5, seed=None):
         """Populates the grid of cells at random, with specified
-        probability.
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
+        """
+        RandomCells(prob, seed).fill(self._own('cells', copy=False))
+        self.invalidate_population()
+
+    def set_cell(self, row, col, alive=True):
+        """Sets the state of the cell at the specified location. If the state
+        changes, the age of the cell is reset and the fates of the cells
+        around it are updated.
+        """
+        row, col = row % self.height, col % self.width
+        if self._take('cells', [row], [col])[0, 0] != alive:
+            self._write('cells', row, col, alive)
+            self.invalidate_population()
+            self._cell_changed(row, col)
+
+    def _cell_changed(self, row, col):
+        """Updates whatever the implementation derives from the cells, after
+        the cell at the specified location changed state.
+        """
+        pass
+
+    def fork(self):
+        """Returns an independent copy of the game, e.g. to run variants of
+        it from the current generation.
+
+        The copy shares the state arrays with this game, which are made
+        read-only. Single cells changed by either game (see set_cell) are
+        kept aside, and each game only copies an array when it next reads it
+        whole, e.g. to compute a generation (or allocates a new one, if it is
+        about to be overwritten). The fork allocates its buffers on first
+        use.
         """
-        rand = np.random.uniform(0.0, 1.0, (self.width, self.height))
-        self.cells = np.int8(rand <= prob)
+        game = copy.copy(self)
+        for name in self.BUFFERS:
+            game.__dict__.pop(name, None)
+        game._sat = None
+        game._sat_generation = None
+
+        for name in self.STATE:
+            self.__dict__[name].flags.writeable = False
+        self._shared = set(self.STATE)
+        game._shared = set(self.STATE)
+        game._changes = dict((name, dict(changes))
+                             for name, changes in self._changes.items())
+        return game
+
+    def _own(self, name, copy=True):
+        """Returns the state array with the specified name, after making it
+        private to this game if it is shared with forks, and applying the
+        cells changed in it. The shared array is copied, unless copy is False
+        because it is about to be overwritten.
+        """
+        if not copy:
+            self._changes.pop(name, None)
+        array = self.__dict__[name]
+        if name in self._shared:
+            array = array.copy() if copy else np.empty_like(array)
+            setattr(self, name, array)
+            self._shared.discard(name)
+
+        changes = self._changes.pop(name, None)
+        if changes:
+            rows, cols = zip(*changes)
+            array[rows, cols] = list(changes.values())
+        return array
+
+    def _write(self, name, row, col, value):
+        """Sets a cell of the state array with the specified name. If the
+        array is shared with forks, the cell is kept aside instead of copying
+        the whole array.
+        """
+        if name in self._shared:
+            self._changes.setdefault(name, {})[row, col] = value
+        else:
+            self.__dict__[name][row, col] = value
+
+    def _take(self, name, rows, cols):
+        """Returns the items of the state array with the specified name in
+        the specified rows and columns (wrapping around the edges of the
+        torus), including the cells changed but not applied to the array.
+        """
+        rows = np.asarray(rows) % self.height
+        cols = np.asarray(cols) % self.width
+        window = self.__dict__[name][np.ix_(rows, cols)]
+        for (row, col), value in self._changes.get(name, {}).items():
+            window[np.ix_(rows == row, cols == col)] = value
+        return window
+
+    def _swap(self, name, buffer_name):
+        """Swaps a state array with the buffer its next value was computed
+        into. A state array shared with forks is not reused as a buffer.
+        """
+        array = getattr(self, name)
+        setattr(self, name, getattr(self, buffer_name))
+        if name in self._shared:
+            array = np.empty_like(array)
+            self._shared.discard(name)
+        setattr(self, buffer_name, array)
+
+    def invalidate_population(self):
+        """Discards the population index. Must be called after modifying the
+        cells directly.
+        """
+        self._sat_generation = None
+
+    def population(self, row=None, col=None, height=None, width=None):
+        """Returns the number of live cells in the specified region, or in
+        the whole grid if no region is specified. The region wraps around the
+        edges of the torus, as many times as needed.
+
+        Regions are counted in constant time from a summed-area table of the
+        cells, which is built by the first query of each generation.
+        """
+        if row is None:
+            if self._sat_generation != self.generation:
+                return int(self.cells.sum(dtype=np.int64))
+            return int(self._summed_area()[-1, -1])
+
+        rows = np.array([[row], [row + height]])
+        cols = np.array([[col, col + width]])
+        counts = self._population_before(rows, cols)
+        return int(counts[1, 1] - counts[0, 1] - counts[1, 0] + counts[0, 0])
+
+    def _snapshot(self):
+        """Returns a Snapshot of the current state of the game, made of
+        read-only views of its arrays.
+        """
+        return Snapshot(self.generation, readonly(self.cells),
+                        readonly(getattr(self, 'fates', None)),
+                        readonly(getattr(self, 'ages', None)),
+                        readonly(self._flips()))
+
+    def _flips(self):
+        """Returns the mask of the cells that changed state at the last
+        generation, or None if the implementation doesn't keep it.
+        """
+        return None
+
+    def _summed_area(self):
+        """Returns the summed-area table of the cells, i.e. the number of
+        live cells above and to the left of each location, as an array with
+        a leading row and column of zeros.
+
+        The table is built at most once per generation.
+        """
+        if self._sat_generation != self.generation:
+            if self._sat is None:
+                # Counts can only overflow 32 bits on huge grids
+                dtype = (np.int32 if self.height * self.width < 2 ** 31
+                         else np.int64)
+                self._sat = np.zeros((self.height + 1, self.width + 1),
+                                     dtype=dtype)
+
+            # Sum the cells down the columns, then along the rows
+            inner = self._sat[1:, 1:]
+            np.cumsum(self.cells, axis=0, dtype=inner.dtype, out=inner)
+            np.cumsum(inner, axis=1, out=inner)
+            self._sat_generation = self.generation
+        return self._sat
+
+    def _population_before(self, rows, cols):
+        """Returns the number of live cells in the rectangles from (0, 0) to
+        each (row, col) location, excluded, of the plane tiled with copies of
+        the torus. rows and cols are arrays, broadcast against each other.
+        """
+        sat = self._summed_area()
+
+        # The rectangle covers whole copies of the torus, whole strips of
+        # rows and of columns, and a part of a single copy
+        rows_wraps, rows = np.divmod(np.asarray(rows, dtype=np.int64),
+                                     self.height)
+        cols_wraps, cols = np.divmod(np.asarray(cols, dtype=np.int64),
+                                     self.width)
+        return (rows_wraps * cols_wraps * sat[-1, -1] +
+                rows_wraps * sat[-1, cols] + cols_wraps * sat[rows, -1] +
+                sat[rows, cols])
+
+    def block_population(self, row, col, height, width, zoom):
+        """Returns the number of live cells in each zoom x zoom block of the
+        specified region, as an array indexed by [row, col] of the block.
+        """
+
+        # If the summed-area table is up to date, each block is counted in
+        # constant time. Building it just for this is slower, though.
+        if self._sat_generation == self.generation:
+            rows = row + zoom * np.arange(height + 1).reshape(-1, 1)
+            cols = col + zoom * np.arange(width + 1)
+            counts = self._population_before(rows, cols)
+            return np.diff(np.diff(counts, axis=0), axis=1)
+
+        rows = np.arange(row, row + height * zoom)
+        cols = np.arange(col, col + width * zoom)
+        return self._sum_blocks(self.cells.take(rows, axis=0, mode='wrap'),
+                                cols, zoom)
+
+    @staticmethod
+    def _sum_blocks(lines, cols, zoom):
+        """Returns the number of live cells in each zoom x zoom block of lines
+        (whole rows of cells), for the specified columns.
+        """
+
+        # Sum the rows of each block first, so that the columns are gathered
+        # from an array zoom times smaller
+        sums = lines.reshape(len(lines) // zoom, zoom, -1).sum(
+            axis=1, dtype=np.int32)
+        sums = sums.take(cols, axis=1, mode='wrap')
+        return sums.reshape(len(sums), -1, zoom).sum(axis=2)
+
+    def _convolve(self):
+        """Returns the convolved matrix of neighbors of the cells, i.e. the
+        convolution of the cells with WEIGHTS, wrapping around the edges.
+
+        The result is a buffer which is overwritten at each call.
+        """
+        if self.use_scipy:
+            from scipy.ndimage import convolve
+            convolve(self.cells, self.WEIGHTS, output=self._con, mode='wrap')
+            return self._con
+
+        cells, padded = self.cells, self._padded
+        row_sums, con = self._row_sums, self._con
+
+        # Copy the cells into the padded buffer, with a one-cell margin that
+        # wraps around the edges of the torus
+        padded[1:-1, 1:-1] = cells
+        padded[0, 1:-1] = cells[-1]
+        padded[-1, 1:-1] = cells[0]
+        padded[:, 0] = padded[:, -2]
+        padded[:, -1] = padded[:, 1]
+
+        # Sum the 3x3 block around each cell, one axis at a time
+        np.add(padded[:, :-2], padded[:, 1:-1], out=row_sums)
+        row_sums += padded[:, 2:]
+        np.add(row_sums[:-2], row_sums[1:-1], out=con)
+        con += row_sums[2:]
+
+        # The block includes the cell itself, which needs a weight of 10. The
+        # row sums aren't needed anymore, so reuse them as a buffer.
+        center = row_sums[1:-1]
+        np.multiply(cells, 9, out=center)
+        con += center
+        return con
+
+    def _cells_from_convolved(self, con, cells):
+        """Fills cells with the new state of the cells, given the convolved
+        matrix of neighbors. con must have been returned by _convolve.
+        """
+
+        # Live cells are the currently dead cells with exactly 3 neighbors
+        # (3 in the convolved matrix), and the currently live cells with 2 or
+        # 3 neighbors (12 or 13, i.e. 6 once halved). The row sums buffer
+        # isn't needed anymore at this point.
+        halved, mask = self._row_sums[1:-1], self._mask
+        np.right_shift(con, 1, out=halved)
+        np.equal(halved, 6, out=mask)
+        np.equal(con, 3, out=cells)
+        cells |= mask
+
+    @staticmethod
+    def _fates_from_convolved(con, fates):
+        """Fills fates with the fates of the cells, given the convolved
+        matrix of neighbors.
+        """
+
+        # Here's the trick: we assigned 10 to the central element of the
+        # weights kernel. Therefore, currently dead cells will have a value
+        # of 0-8 in the convolved matrix, and currently live cells will have
+        # a value of 10-18 (depending on the number of neighbors). The fates
+        # are simply looked up in a table indexed by that value:
+        # - dead cells with exactly 3 neighbors will be born,
+        # - live cells with less than 2 neighbors will die by isolation,
+        # - live cells with 2 or 3 neighbors survive,
+        # - live cells with more than 3 neighbors die by overcrowding,
+        # - and the other dead cells stay dead.
+        np.take(CONVOLVED_FATES, con, out=fates)
+
+    @classmethod
+    def _fates_from_window(cls, window):
+        """Returns the fates of the cells of a window, given with a one-cell
+        margin on each side. The margin itself is not included in the result.
+        """
+        height, width = window.shape[0] - 2, window.shape[1] - 2
+
+        # Same as the convolve operation with WEIGHTS, restricted to the
+        # inside of the window
+        con = 10 * window[1:-1, 1:-1].astype(np.int8)
+        for drow in range(3):
+            for dcol in range(3):
+                if (drow, dcol) != (1, 1):
+                    con += window[drow:drow + height, dcol:dcol + width]
+
+        fates = np.empty((height, width), dtype=np.int8)
+        cls._fates_from_convolved(con, fates)
+        return fates
 
 
 class GameNumPy(BaseGameNumPy):
-    """Full-featured NumPy/SciPy-based implementation of the Game of Life."""
+    """Full-featured NumPy-based implementation of the Game of Life."""
+
+    STATE = ('cells', 'fates', 'ages')
+    fates = StateArray('fates')
+    ages = StateArray('ages')
+
+    BUFFERS = BaseGameNumPy.BUFFERS + ('_new_cells', '_changed', '_unchanged')
 
     def _init(self):
         """Initializes the internal structures used by the implementation."""
@@ -59,20 +449,54 @@ class GameNumPy(BaseGameNumPy):
 
         # Fates grid. Each item contains the fate of the cell at the location
         # for the next generation.
-        self.fates = np.zeros((self.width, self.height), dtype=np.int8)
+        self.fates = np.zeros((self.height, self.width), dtype=np.int8)
         self.fates.fill(Fate.StayDead)
 
         # Ages grid. Each item is the number of generations the cell at the
         # location has been in its current state (dead or alive).
-        self.ages = np.zeros((self.width, self.height), dtype=np.int64)
+        self.ages = np.zeros((self.height, self.width), dtype=np.int64)
+
+    def _init_buffers(self):
+        """Initializes the buffers used to compute generations."""
+        super(GameNumPy, self)._init_buffers()
 
-    def populate_random(self, prob=0.5):
+        # The new cells are computed into this grid, and swapped with the
+        # current ones at each generation
+        self._new_cells = np.zeros((self.height, self.width), dtype=np.int8)
+        self._changed = np.zeros((self.height, self.width), dtype=bool)
+        self._unchanged = np.zeros((self.height, self.width), dtype=bool)
+
+    def populate_random(self, prob=0.5, seed=None):
         """Populates the grid of cells at random, with specified
-        probability.
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
         """
-        super(GameNumPy, self).populate_random(prob)
+        super(GameNumPy, self).populate_random(prob, seed)
         self._compute_fates()
 
+    def _cell_changed(self, row, col):
+        """Updates the fates of the cells around the cell at the specified
+        location, and resets its age, after it changed state.
+        """
+
+        # The fates of the 3x3 cells around the changed cell depend on the
+        # 5x5 cells around it
+        window = self._take('cells', np.arange(row - 2, row + 3),
+                            np.arange(col - 2, col + 3))
+        fates = self._fates_from_window(window)
+        for drow in range(3):
+            for dcol in range(3):
+                self._write('fates', (row + drow - 1) % self.height,
+                            (col + dcol - 1) % self.width, fates[drow, dcol])
+
+        self._write('ages', row, col, 0)
+
+    def _flips(self):
+        """Returns the mask of the cells that changed state at the last
+        generation.
+        """
+        return self._changed
+
     def _step(self):
         """Computes the next generation of cells based on the current one."""
         self._apply_fates()
@@ -80,83 +504,71 @@ class GameNumPy(BaseGameNumPy):
 
     def fate(self, row, col):
         """Returns the fate of the cell at the specified location."""
-        line = self.fates.take(row, axis=0, mode='wrap')
-        fate = line.take(col, mode='wrap')
-        return fate
+        return self._take('fates', [row], [col])[0, 0]
 
     def age(self, row, col):
         """Returns the age of a cell, i.e. how many generations it's been in
         its current state (dead or alive).
         """
-        line = self.ages.take(row, axis=0, mode='wrap')
-        age = line.take(col, mode='wrap')
-        return age
+        return self._take('ages', [row], [col])[0, 0]
 
     def _compute_fates(self):
         """Computes the fate of all cells."""
 
         # Compute the convolved matrix of neighbors
-        con = convolve(self.cells, self.WEIGHTS, mode='wrap')
-
-        # Here's the trick: we assigned 10 to the central element of the
-        # weights kernel. Therefore, currently dead cells will have a value
-        # of 0-8 in the convolved matrix, and currently live cells will have
-        # a value of 10-18 (depending on the number of neighbors).
-
-        # Reset the fates grid
-        self.fates.fill(Fate.StayDead)
-
-        # Dead cells with exactly 3 neighbors will be born
-        self.fates[con == 3] = Fate.Birth
-
-        # Live cells with less than 2 neighbors will die by isolation
-        self.fates[(con >= 10) & (con < 12)] = Fate.DeathByIsolation
-
-        # Live cells with 2 or 3 neighbors survive
-        self.fates[(con == 12) | (con == 13)] = Fate.Survive
+        con = self._convolve()
 
-        # Live cells with more than 3 neighbors die by overcrowding
-        self.fates[con > 13] = Fate.DeathByOvercrowding
+        # Derive the fates from it
+        self._fates_from_convolved(con, self._own('fates', copy=False))
 
     def _apply_fates(self):
         """Applies the fates to all cells."""
 
         # The new cells grid has live cells for every "birth" or "survive"
-        # fates, and dead cells for everything else
-        new_cells = np.zeros((self.width, self.height), dtype=np.int8)
-        new_cells[(self.fates == Fate.Birth) |
-                  (self.fates == Fate.Survive)] = 1
+        # fates (1 or 2), and dead cells for everything else
+        new_cells = self._new_cells
+        np.subtract(self.fates, Fate.Birth, out=new_cells)
+        np.less_equal(new_cells.view(np.uint8), Fate.Survive - Fate.Birth,
+                      out=new_cells)
 
         # Check which cells have changed (dead to live or vice-versa)
-        unchanged = new_cells == self.cells
-        changed = np.logical_not(unchanged)
+        unchanged = self._unchanged
+        np.not_equal(new_cells, self.cells, out=self._changed)
+        np.logical_not(self._changed, out=unchanged)
 
         # Unchanged cells grow one generation older, changed cells have their
         # ages reset to zero
-        self.ages[unchanged] += 1
-        self.ages[changed] = 0
+        ages = self._own('ages')
+        ages += 1
+        ages *= unchanged
 
         # Memorize the new cells grid
-        self.cells = new_cells
+        self._swap('cells', '_new_cells')
+
+    def region(self, row, col, height, width):
+        """Returns the fates and ages of the cells in the specified region, as
+        a pair of arrays indexed by [row, col] relative to the region's top
+        left corner. The region wraps around the edges of the torus.
+        """
+        rows = np.arange(row, row + height)
+        cols = np.arange(col, col + width)
+        return self._take('fates', rows, cols), self._take('ages', rows, cols)
 
 
 class GameNumPyLight(BaseGameNumPy):
-    """Light version of the NumPy/SciPy-based implementation of the Game of
-    Life.
-    """
+    """Light version of the NumPy-based implementation of the Game of Life."""
 
     def _step(self):
         """Computes the next generation of cells based on the current one."""
 
         # Compute the convolved matrix of neighbors
-        con = convolve(self.cells, self.WEIGHTS, mode='wrap')
+        con = self._convolve()
 
         # The trick is the same as in the full-featured version, but we don't
         # need to track fates, so we can simply set the new live cells to be:
         # - currently dead cells with exactly 3 neighbors, and
         # - currently live cells with 2 or 3 neighbors
-        self.cells.fill(0)
-        self.cells[(con == 3) | (con == 12) | (con == 13)] = 1
+        self._cells_from_convolved(con, self._own('cells', copy=False))
 
     def fate(self, row, col):
         """Returns the fate of the cell at the specified location."""
@@ -164,8 +576,7 @@ class GameNumPyLight(BaseGameNumPy):
         # The light implementation does not know the fates, so it cheats by
         # returning "survive" for all currently live cells and "stay dead" for
         # all currently dead cells.
-        line = self.cells.take(row, axis=0, mode='wrap')
-        cell = line.take(col, mode='wrap')
+        cell = self._take('cells', [row], [col])[0, 0]
         return Fate.Survive if cell == 1 else Fate.StayDead
 
     def age(self, row, col):
@@ -176,3 +587,95 @@ class GameNumPyLight(BaseGameNumPy):
         # The light implementation does not know the ages, so it cheats and
         # returns a constant value.
         return 1000
+
+
+class GameNumPyLazy(BaseGameNumPy):
+    """Lazy version of the NumPy-based implementation of the Game of Life.
+
+    Only the cells are computed at each generation, like in the light
+    implementation. Fates are derived on demand for the requested region, and
+    ages from the generation at which each cell last changed state.
+    """
+
+    STATE = ('cells', 'stamps')
+    stamps = StateArray('stamps')
+
+    BUFFERS = BaseGameNumPy.BUFFERS + ('_new_cells', '_changed')
+
+    def _init(self):
+        """Initializes the internal structures used by the implementation."""
+        super(GameNumPyLazy, self)._init()
+
+        # Stamps grid. Each item is the generation at which the cell at the
+        # location last changed state (dead to live or vice-versa).
+        self.stamps = np.empty((self.height, self.width), dtype=np.int32)
+        self.stamps.fill(self.generation)
+
+    def _init_buffers(self):
+        """Initializes the buffers used to compute generations."""
+        super(GameNumPyLazy, self)._init_buffers()
+
+        # The new cells are computed into this grid, and swapped with the
+        # current ones at each generation
+        self._new_cells = np.zeros((self.height, self.width), dtype=np.int8)
+        self._changed = np.zeros((self.height, self.width), dtype=bool)
+
+    def populate_random(self, prob=0.5, seed=None):
+        """Populates the grid of cells at random, with specified
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
+        """
+        super(GameNumPyLazy, self).populate_random(prob, seed)
+        self._own('stamps', copy=False).fill(self.generation)
+
+    def _cell_changed(self, row, col):
+        """Resets the age of the cell at the specified location, after it
+        changed state.
+        """
+        self._write('stamps', row, col, self.generation)
+
+    def _flips(self):
+        """Returns the mask of the cells that changed state at the last
+        generation.
+        """
+        return self._changed
+
+    def _step(self):
+        """Computes the next generation of cells based on the current one."""
+
+        # Compute the convolved matrix of neighbors
+        con = self._convolve()
+
+        # Same as in the light version, but into another grid so that the
+        # changed cells can be stamped with the generation being computed
+        new_cells = self._new_cells
+        self._cells_from_convolved(con, new_cells)
+        np.not_equal(new_cells, self.cells, out=self._changed)
+        np.putmask(self._own('stamps'), self._changed, self.generation + 1)
+        self._swap('cells', '_new_cells')
+
+    def fate(self, row, col):
+        """Returns the fate of the cell at the specified location."""
+        fates, _ = self.region(row, col, 1, 1)
+        return fates[0, 0]
+
+    def age(self, row, col):
+        """Returns the age of a cell, i.e. how many generations it's been in
+        its current state (dead or alive).
+        """
+        return self.generation - self._take('stamps', [row], [col])[0, 0]
+
+    def region(self, row, col, height, width):
+        """Returns the fates and ages of the cells in the specified region, as
+        a pair of arrays indexed by [row, col] relative to the region's top
+        left corner. The region wraps around the edges of the torus.
+        """
+
+        # Extract the region with a one-cell margin, so that the neighbors of
+        # the cells on the region's edges are known
+        rows = np.arange(row - 1, row + height + 1)
+        cols = np.arange(col - 1, col + width + 1)
+        fates = self._fates_from_window(self._take('cells', rows, cols))
+        ages = self.generation - self._take('stamps', rows[1:-1], cols[1:-1])
+
+        return fates, ages
@@ -19,6 +19,9 @@
 from __future__ import (division, absolute_import, print_function,
                         unicode_literals)
 
+import copy
+from collections import namedtuple
+
 
 class Fate(object):
     """Enumeration of the possible fates of a cell.
@@ -30,6 +33,12 @@ class Fate(object):
     StayDead, Birth, Survive, DeathByIsolation, DeathByOvercrowding = range(5)
 
 
+"""State of a game at a given generation, as yielded by
+GameOfLife.iter_generations. Items the implementation doesn't track are None.
+"""
+Snapshot = namedtuple('Snapshot', 'generation cells fates ages flips')
+
+
 class GameOfLife(object):
     """Base class for the Game of Life."""
 
@@ -52,14 +61,40 @@ class GameOfLife(object):
         self.generation = 1
         self._init()
 
-    def populate_random(self, prob=0.5):
+    def populate_random(self, prob=0.5, seed=None):
         """Populates the grid of cells at random, with specified
-        probability.
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
 
         Should be implemented by the derived class.
         """
         raise NotImplementedError
 
+    def set_cell(self, row, col, alive=True):
+        """Sets the state of the cell at the specified location. If the state
+        changes, the age of the cell is reset and the fates of the cells
+        around it are updated.
+
+        Should be implemented by the derived class.
+        """
+        raise NotImplementedError
+
+    def flip(self, row, col):
+        """Flips the state of the cell at the specified location (dead to
+        live or vice-versa).
+        """
+        alive = self.fate(row, col) not in (Fate.StayDead, Fate.Birth)
+        self.set_cell(row, col, not alive)
+
+    def fork(self):
+        """Returns an independent copy of the game, e.g. to run variants of
+        it from the current generation.
+
+        Derived classes may override this to share storage with the copy
+        until either of them writes to it.
+        """
+        return copy.deepcopy(self)
+
     def next_generation(self):
         """Triggers the next generation of cells, and increments
         generation.
@@ -74,6 +109,42 @@ class GameOfLife(object):
         """
         raise NotImplementedError
 
+    def iter_generations(self, n=None, every=1):
+        """Advances the game every generations at a time, n times (forever if
+        n is None), and yields a Snapshot of its state after each advance.
+
+        The items of the snapshots are read-only views of the game's own
+        storage, not copies: they are only valid until the generator is
+        resumed, and must be copied to be kept.
+
+        Raises ValueError if every is less than 1, and NotImplementedError if
+        the implementation doesn't support snapshots, before advancing the
+        game.
+        """
+        if every < 1:
+            raise ValueError('every must be at least 1, not {}'.format(every))
+        if type(self)._snapshot == GameOfLife._snapshot:
+            raise NotImplementedError('{} does not support snapshots'
+                                      .format(type(self).__name__))
+        return self._iter_generations(n, every)
+
+    def _iter_generations(self, n, every):
+        """Generator behind iter_generations()."""
+        count = 0
+        while n is None or count < n:
+            for _ in range(every):
+                self.next_generation()
+            yield self._snapshot()
+            count += 1
+
+    def _snapshot(self):
+        """Returns a Snapshot of the current state of the game, made of
+        read-only views of the implementation's storage.
+
+        Should be implemented by the derived class.
+        """
+        raise NotImplementedError
+
     def fate(self, row, col):
         """Returns the fate of the cell at the specified location.
 
@@ -88,3 +159,27 @@ class GameOfLife(object):
         Should be implemented by the derived class.
         """
         raise NotImplementedError
+
+    def region(self, row, col, height, width):
+        """Returns the fates and ages of the cells in the specified region, as
+        a pair of grids indexed by [row][col] relative to the region's top
+        left corner. The region wraps around the edges of the torus.
+
+        Derived classes may override this to compute the whole region at
+        once instead of querying each cell.
+        """
+        fates = [[self.fate(row + r, col + c) for c in range(width)]
+                 for r in range(height)]
+        ages = [[self.age(row + r, col + c) for c in range(width)]
+                for r in range(height)]
+        return fates, ages
+
+    def block_population(self, row, col, height, width, zoom):
+        """Returns the number of live cells in each zoom x zoom block of the
+        region of height x width blocks whose top left corner is the cell at
+        the specified location, as a grid indexed by [row][col] of the block.
+        The region wraps around the edges of the torus.
+
+        Should be implemented by the derived class, as a bulk operation.
+        """
+        raise NotImplementedError
@@ -21,9 +21,12 @@ Python.
 from __future__ import (division, absolute_import, print_function,
                         unicode_literals)
 
-import random
+import copy
+from array import array
+from collections import OrderedDict
 
-from gameoflife.gameoflife import GameOfLife, Fate
+from gameoflife.gameoflife import GameOfLife, Fate, Snapshot
+from gameoflife.populate import RandomCells
 
 
 class CircularList(list):
@@ -63,6 +66,63 @@ class TorusGrid(object):
         return s + '\n'
 
 
+class GridView(object):
+    """Read-only view of a TorusGrid, indexed by [row][col] like the grid.
+    Its rows are read-only views as well.
+    """
+
+    def __init__(self, grid, height):
+        """Creates a view of the specified grid."""
+        self._grid = grid
+        self._height = height
+
+    def __len__(self):
+        return self._height
+
+    def __getitem__(self, idx):
+        return RowView(self._grid[idx])
+
+    def __iter__(self):
+        return (self[idx] for idx in range(self._height))
+
+
+class RowView(object):
+    """Read-only view of a row of a TorusGrid."""
+
+    def __init__(self, row):
+        """Creates a view of the specified row."""
+        self._row = row
+
+    def __len__(self):
+        return len(self._row)
+
+    def __getitem__(self, idx):
+        return self._row[idx]
+
+    def __iter__(self):
+        return iter(self._row)
+
+
+def sum_blocks(lines, col, width, zoom):
+    """Returns the number of live cells in each zoom x zoom block of lines
+    (whole rows of cells, as sequences of 0 and 1), for width blocks starting
+    at the specified column, as a list of rows of blocks.
+    """
+    blocks = []
+    for start in range(0, len(lines), zoom):
+        totals = [0] * width
+        for line in lines[start:start + zoom]:
+            # Rotate the line so that it starts at col, and repeat it if the
+            # blocks go around the torus more than once
+            offset = col % len(line)
+            line = line[offset:] + line[:offset]
+            line *= -(-width * zoom // len(line))
+            for idx in range(width):
+                totals[idx] += sum(line[idx * zoom:(idx + 1) * zoom])
+        blocks.append(totals)
+    return blocks
+
+
 class BaseGamePython(GameOfLife):
     """Base class for both pure Python implementations."""
 
@@ -73,13 +133,41 @@ class BaseGamePython(GameOfLife):
         # one.
         self.cells = TorusGrid(self.width, self.height, 0)
 
-    def populate_random(self, prob=0.5):
+    def populate_random(self, prob=0.5, seed=None):
         """Populates the grid of cells at random, with specified
-        probability.
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
         """
-        for row in range(self.height):
-            for col in range(self.width):
-                self.cells[row][col] = 1 if random.random() <= prob else 0
+        source = RandomCells(prob, seed)
+        for start, stop in source.bands(0, self.height):
+            cells = bytearray(source.rows(start, stop, self.width))
+            for row in range(start, stop):
+                offset = (row - start) * self.width
+                self.cells[row] = CircularList(
+                    cells[offset:offset + self.width])
+
+    def _snapshot(self):
+        """Returns a Snapshot of the current state of the game, with a
+        read-only view of the cells, indexed by [row][col].
+        """
+        return Snapshot(self.generation, GridView(self.cells, self.height),
+                        None, None, None)
+
+    def set_cell(self, row, col, alive=True):
+        """Sets the state of the cell at the specified location. If the state
+        changes, the age of the cell is reset and the fates of the cells
+        around it are updated.
+        """
+        cell = 1 if alive else 0
+        if self.cells[row][col] != cell:
+            self.cells[row][col] = cell
+            self._cell_changed(row, col)
+
+    def _cell_changed(self, row, col):
+        """Updates whatever the implementation derives from the cells, after
+        the cell at the specified location changed state.
+        """
+        pass
 
     @staticmethod
     def coords_neighbors(row, col):
@@ -91,6 +179,13 @@ class BaseGamePython(GameOfLife):
                 if (row, col) != (x, y):
                     yield (x, y)
 
+    def block_population(self, row, col, height, width, zoom):
+        """Returns the number of live cells in each zoom x zoom block of the
+        specified region, as a list of rows of blocks.
+        """
+        lines = [list(self.cells[r]) for r in range(row, row + height * zoom)]
+        return sum_blocks(lines, col, width, zoom)
+
     def get_number_neighbors(self, row, col):
         """Returns the number of live cells in the Moore neighborhood on the
         specified location.
@@ -117,14 +212,23 @@ class GamePython(BaseGamePython):
         # location has been in its current state (dead or alive).
         self.ages = TorusGrid(self.width, self.height, 0)
 
-    def populate_random(self, prob=0.5):
+    def populate_random(self, prob=0.5, seed=None):
         """Populates the grid of cells at random, with specified
-        probability.
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
         """
-        super(GamePython, self).populate_random(prob)
+        super(GamePython, self).populate_random(prob, seed)
         self.ages = TorusGrid(self.width, self.height, 0)
         self._compute_fates()
 
+    def _snapshot(self):
+        """Returns a Snapshot of the current state of the game, with
+        read-only views of the cells, fates and ages, indexed by [row][col].
+        """
+        return Snapshot(self.generation, GridView(self.cells, self.height),
+                        GridView(self.fates, self.height),
+                        GridView(self.ages, self.height), None)
+
     def _step(self):
         """Computes the next generation of cells based on the current one."""
         self._apply_fates()
@@ -140,31 +244,44 @@ class GamePython(BaseGamePython):
         """
         return self.ages[row][col]
 
+    def _cell_changed(self, row, col):
+        """Updates the fates of the cells around the cell at the specified
+        location, and resets its age, after it changed state.
+        """
+        for x in range(row - 1, row + 2):
+            for y in range(col - 1, col + 2):
+                self._compute_fate(x, y)
+        self.ages[row][col] = 0
+
     def _compute_fates(self):
         """Computes the fate of all cells."""
         for row in range(self.height):
             for col in range(self.width):
-                num_neighbors = self.get_number_neighbors(row, col)
-
-                if self.cells[row][col] == 0:
-                    # Currently dead cell
-                    if num_neighbors == 3:
-                        # Exactly 3 neighbors: a new cell is born!
-                        self.fates[row][col] = Fate.Birth
-                    else:
-                        # Otherwise: the cell stays dead
-                        self.fates[row][col] = Fate.StayDead
-                else:
-                    # Currently live cell
-                    if num_neighbors < 2:
-                        # Not enough neighbors: death by isolation
-                        self.fates[row][col] = Fate.DeathByIsolation
-                    elif num_neighbors > 3:
-                        # Too many neighbors: death by overcrowding
-                        self.fates[row][col] = Fate.DeathByOvercrowding
-                    else:
-                        # Just the right number of neighbors: survive
-                        self.fates[row][col] = Fate.Survive
+                self._compute_fate(row, col)
+
+    def _compute_fate(self, row, col):
+        """Computes the fate of the cell at the specified location."""
+        num_neighbors = self.get_number_neighbors(row, col)
+
+        if self.cells[row][col] == 0:
+            # Currently dead cell
+            if num_neighbors == 3:
+                # Exactly 3 neighbors: a new cell is born!
+                self.fates[row][col] = Fate.Birth
+            else:
+                # Otherwise: the cell stays dead
+                self.fates[row][col] = Fate.StayDead
+        else:
+            # Currently live cell
+            if num_neighbors < 2:
+                # Not enough neighbors: death by isolation
+                self.fates[row][col] = Fate.DeathByIsolation
+            elif num_neighbors > 3:
+                # Too many neighbors: death by overcrowding
+                self.fates[row][col] = Fate.DeathByOvercrowding
+            else:
+                # Just the right number of neighbors: survive
+                self.fates[row][col] = Fate.Survive
 
     def _apply_fates(self):
         """Applies the fates to all cells."""
@@ -215,3 +332,222 @@ class GamePythonLight(BaseGamePython):
         # The light implementation does not know the ages, so it cheats and
         # returns a constant value.
         return 1000
+
+
+class GamePythonLazy(GamePythonLight):
+    """Lazy version of the pure Python implementation of the Game of Life.
+
+    Only the cells are computed at each generation, like in the light
+    implementation. Fates are derived on demand from the neighborhood of the
+    requested cells, and ages from the generation at which each cell last
+    changed state.
+    """
+
+    def _init(self):
+        """Initializes the internal structures used by the implementation."""
+        super(GamePythonLazy, self)._init()
+
+        # Stamps grid. Each item is the generation at which the cell at the
+        # location last changed state (dead to live or vice-versa).
+        self.stamps = TorusGrid(self.width, self.height, self.generation)
+
+    def populate_random(self, prob=0.5, seed=None):
+        """Populates the grid of cells at random, with specified
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
+        """
+        super(GamePythonLazy, self).populate_random(prob, seed)
+        self.stamps = TorusGrid(self.width, self.height, self.generation)
+
+    def _cell_changed(self, row, col):
+        """Resets the age of the cell at the specified location, after it
+        changed state.
+        """
+        self.stamps[row][col] = self.generation
+
+    def _step(self):
+        """Computes the next generation of cells based on the current one."""
+        old_cells = self.cells
+        super(GamePythonLazy, self)._step()
+
+        # Stamp the cells that have changed with the generation being
+        # computed
+        next_generation = self.generation + 1
+        for row in range(self.height):
+            old_row, new_row = old_cells[row], self.cells[row]
+            stamps_row = self.stamps[row]
+            for col in range(self.width):
+                if old_row[col] != new_row[col]:
+                    stamps_row[col] = next_generation
+
+    def fate(self, row, col):
+        """Returns the fate of the cell at the specified location."""
+        num_neighbors = self.get_number_neighbors(row, col)
+
+        if self.cells[row][col] == 0:
+            return Fate.Birth if num_neighbors == 3 else Fate.StayDead
+        elif num_neighbors < 2:
+            return Fate.DeathByIsolation
+        elif num_neighbors > 3:
+            return Fate.DeathByOvercrowding
+        else:
+            return Fate.Survive
+
+    def age(self, row, col):
+        """Returns the age of a cell, i.e. how many generations it's been in
+        its current state (dead or alive).
+        """
+        return self.generation - self.stamps[row][col]
+
+
+class GamePythonFlat(GameOfLife):
+    """Pure Python implementation of the Game of Life on flat arrays.
+
+    Cells are stored in a single bytearray, row after row, and the indexes of
+    the 8 neighbors of every cell are precomputed in index tables, so that
+    computing a generation doesn't need any modulo operations on the torus.
+    Like the lazy implementation, only the cells are computed at each
+    generation: fates are derived on demand and ages from the generation at
+    which each cell last changed state.
+    """
+
+    # Index tables, cached by (width, height), least recently used first.
+    # Tables take about 32 bytes per cell, so only a few sizes are kept.
+    _neighbor_tables = OrderedDict()
+    MAX_CACHED_TABLES = 4
+
+    # New state of a cell, indexed by its number of live neighbors plus 9 if
+    # it is currently alive. A bytearray, so that items are ints on Python 2
+    # too
+    RULE = bytearray([0, 0, 0, 1, 0, 0, 0, 0, 0,
+                      0, 0, 1, 1, 0, 0, 0, 0, 0])
+
+    def _init(self):
+        """Initializes the internal structures used by the implementation."""
+        size = self.width * self.height
+
+        # Cells array. Each item is either 0 for a dead cell or 1 for a live
+        # one. The new cells are computed into the second array, and the two
+        # arrays are swapped at each generation.
+        self.cells = bytearray(size)
+        self._new_cells = bytearray(size)
+
+        # Stamps array. Each item is the generation at which the cell last
+        # changed state (dead to live or vice-versa).
+        self.stamps = array('i', [self.generation]) * size
+
+        # Neighbor index tables: one array per direction, containing the
+        # index of the neighbor of each cell in that direction
+        key = (self.width, self.height)
+        tables = self._neighbor_tables.pop(key, None)
+        if tables is None:
+            tables = self._build_neighbor_tables()
+        self._neighbor_tables[key] = tables
+        while len(self._neighbor_tables) > self.MAX_CACHED_TABLES:
+            self._neighbor_tables.popitem(last=False)
+        self.neighbor_tables = tables
+
+    def _build_neighbor_tables(self):
+        """Builds the neighbor index tables for the grid's dimensions."""
+        tables = []
+        for drow in (-1, 0, 1):
+            for dcol in (-1, 0, 1):
+                if (drow, dcol) == (0, 0):
+                    continue
+                cols = [(col + dcol) % self.width
+                        for col in range(self.width)]
+                table = array('i')
+                for row in range(self.height):
+                    start = ((row + drow) % self.height) * self.width
+                    table.extend([start + col for col in cols])
+                tables.append(table)
+        return tuple(tables)
+
+    def _index(self, row, col):
+        """Returns the index of the cell at the specified location."""
+        return (row % self.height) * self.width + col % self.width
+
+    def populate_random(self, prob=0.5, seed=None):
+        """Populates the grid of cells at random, with specified
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
+        """
+        source = RandomCells(prob, seed)
+        for start, stop in source.bands(0, self.height):
+            self.cells[start * self.width:stop * self.width] = \
+                source.rows(start, stop, self.width)
+        self.stamps = array('i', [self.generation]) * len(self.cells)
+
+    def set_cell(self, row, col, alive=True):
+        """Sets the state of the cell at the specified location. If the state
+        changes, the age of the cell is reset.
+        """
+        idx, cell = self._index(row, col), 1 if alive else 0
+        if self.cells[idx] != cell:
+            self.cells[idx] = cell
+            self.stamps[idx] = self.generation
+
+    def fork(self):
+        """Returns an independent copy of the game, e.g. to run variants of
+        it from the current generation. The neighbor index tables are shared.
+        """
+        game = copy.copy(self)
+        game.cells = bytearray(self.cells)
+        game._new_cells = bytearray(len(self.cells))
+        game.stamps = array('i', self.stamps)
+        return game
+
+    def _step(self):
+        """Computes the next generation of cells based on the current one."""
+        cells, new_cells = self.cells, self._new_cells
+        stamps, rule = self.stamps, self.RULE
+        next_generation = self.generation + 1
+
+        for idx, n1, n2, n3, n4, n5, n6, n7, n8 in zip(
+                range(len(cells)), *self.neighbor_tables):
+            cell = rule[cells[n1] + cells[n2] + cells[n3] + cells[n4] +
+                        cells[n5] + cells[n6] + cells[n7] + cells[n8] +
+                        9 * cells[idx]]
+            new_cells[idx] = cell
+            if cell != cells[idx]:
+                stamps[idx] = next_generation
+
+        self.cells, self._new_cells = new_cells, cells
+
+    def _snapshot(self):
+        """Returns a Snapshot of the current state of the game, with a
+        read-only memoryview of the cells, row after row.
+        """
+        cells = memoryview(self.cells)
+        if hasattr(cells, 'toreadonly'):
+            cells = cells.toreadonly()
+        return Snapshot(self.generation, cells, None, None, None)
+
+    def fate(self, row, col):
+        """Returns the fate of the cell at the specified location."""
+        idx = self._index(row, col)
+        num_neighbors = sum(self.cells[table[idx]]
+                            for table in self.neighbor_tables)
+
+        if self.cells[idx] == 0:
+            return Fate.Birth if num_neighbors == 3 else Fate.StayDead
+        elif num_neighbors < 2:
+            return Fate.DeathByIsolation
+        elif num_neighbors > 3:
+            return Fate.DeathByOvercrowding
+        else:
+            return Fate.Survive
+
+    def age(self, row, col):
+        """Returns the age of a cell, i.e. how many generations it's been in
+        its current state (dead or alive).
+        """
+        return self.generation - self.stamps[self._index(row, col)]
+
+    def block_population(self, row, col, height, width, zoom):
+        """Returns the number of live cells in each zoom x zoom block of the
+        specified region, as a list of rows of blocks.
+        """
+        lines = [self.cells[self._index(r, 0):self._index(r, 0) + self.width]
+                 for r in range(row, row + height * zoom)]
+        return sum_blocks(lines, col, width, zoom)
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides a class that implements the Game of Life on sparse
+grids, using tiles of NumPy arrays.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import copy
+
+import numpy as np
+
+from gameoflife.gameoflife import GameOfLife, Snapshot
+from gameoflife.gamenumpy import BaseGameNumPy, readonly
+from gameoflife.populate import RandomCells
+
+
+"""For a neighboring tile in each direction (-1, 0 or 1 on each axis), the
+slices of the neighbor facing the tile, and where they go in the padded
+buffer of the tile.
+"""
+SRC_SLICES = {-1: slice(-1, None), 0: slice(None), 1: slice(0, 1)}
+DST_SLICES = {-1: slice(0, 1), 0: slice(1, -1), 1: slice(-1, None)}
+
+
+class GameTiled(GameOfLife):
+    """Tiled sparse implementation of the Game of Life.
+
+    The torus is cut into square tiles (the ones on the bottom and right
+    edges may be smaller if the tile size doesn't divide the dimensions),
+    and only the tiles containing live cells are stored. Each generation
+    only computes the stored tiles and their neighbors on the sides where
+    they have live cells, so memory and time are proportional to the
+    occupied area rather than to the size of the grid.
+
+    Like the light implementations, it does not keep track of the fates and
+    ages of the cells. Fates are derived on demand for the requested region.
+    """
+
+    # Default size of the tiles
+    TILE_SIZE = 64
+
+    def __init__(self, width, height, tile_size=TILE_SIZE):
+        """Creates a new instance of the Game of Life."""
+        self.tile_size = tile_size
+        super(GameTiled, self).__init__(width, height)
+
+    def _init(self):
+        """Initializes the internal structures used by the implementation."""
+
+        # Number of tiles on each axis
+        self.tile_rows = -(-self.height // self.tile_size)
+        self.tile_cols = -(-self.width // self.tile_size)
+
+        # Tiles, indexed by (tile_row, tile_col). Each item is an array whose
+        # items are either 0 for a dead cell or 1 for a live one. Tiles
+        # without live cells are not stored.
+        self.tiles = {}
+
+        # Keys of the tiles this game may write to. The other ones may be
+        # shared with forks of the game, and are copied before being written.
+        self._owned = set()
+
+        self._init_buffers()
+
+    def _init_buffers(self):
+        """Initializes the buffers used to compute generations."""
+
+        # Buffers for the computation of a tile: its cells with a one-cell
+        # margin, and the number of neighbors of each cell
+        self._padded = np.zeros((self.tile_size + 2, self.tile_size + 2),
+                                dtype=np.uint8)
+        self._neighbors = np.zeros((self.tile_size, self.tile_size),
+                                   dtype=np.uint8)
+
+    def _tile_shape(self, tile_row, tile_col):
+        """Returns the shape of the specified tile."""
+        return (min(self.tile_size, self.height - tile_row * self.tile_size),
+                min(self.tile_size, self.width - tile_col * self.tile_size))
+
+    def _neighbor(self, tile_row, tile_col, drow, dcol):
+        """Returns the key of the neighbor of a tile in the specified
+        direction.
+        """
+        return ((tile_row + drow) % self.tile_rows,
+                (tile_col + dcol) % self.tile_cols)
+
+    def populate_random(self, prob=0.5, seed=None):
+        """Populates the grid of cells at random, with specified
+        probability. The same seed gives the same grid whatever the
+        implementation (see populate.RandomCells).
+        """
+        source = RandomCells(prob, seed)
+        self.tiles = {}
+        for tile_row in range(self.tile_rows):
+            # Draw a row of tiles at a time
+            row = tile_row * self.tile_size
+            rows = source.array(row, min(row + self.tile_size, self.height),
+                                self.width)
+            for tile_col in range(self.tile_cols):
+                col = tile_col * self.tile_size
+                tile = rows[:, col:col + self.tile_size].copy()
+                if tile.any():
+                    self.tiles[tile_row, tile_col] = tile
+        self._owned = set(self.tiles)
+
+    def set_cell(self, row, col, alive=True):
+        """Sets the state of the cell at the specified location."""
+        row, col = row % self.height, col % self.width
+        key = (row // self.tile_size, col // self.tile_size)
+
+        tile = self.tiles.get(key)
+        if tile is None:
+            if not alive:
+                return
+            tile = np.zeros(self._tile_shape(*key), dtype=np.uint8)
+            self.tiles[key] = tile
+            self._owned.add(key)
+        elif key not in self._owned:
+            tile = tile.copy()
+            self.tiles[key] = tile
+            self._owned.add(key)
+
+        tile[row % self.tile_size, col % self.tile_size] = 1 if alive else 0
+        if not alive and not tile.any():
+            del self.tiles[key]
+            self._owned.discard(key)
+
+    def fork(self):
+        """Returns an independent copy of the game, e.g. to run variants of
+        it from the current generation.
+
+        The copy shares the tiles with this game: each game copies a tile the
+        first time it writes to it. Generations create new tiles anyway.
+        """
+        game = copy.copy(self)
+        game.tiles = dict(self.tiles)
+        game._init_buffers()
+        self._owned = set()
+        game._owned = set()
+        return game
+
+    def _step(self):
+        """Computes the next generation of cells based on the current one."""
+
+        # Tiles to compute: the stored ones, plus their neighbors on the sides
+        # where they have live cells on the edge
+        active = set(self.tiles)
+        for (tile_row, tile_col), tile in self.tiles.items():
+            top, bottom = tile[0].any(), tile[-1].any()
+            left, right = tile[:, 0].any(), tile[:, -1].any()
+            for drow, dcol, border in ((-1, 0, top), (1, 0, bottom),
+                                       (0, -1, left), (0, 1, right),
+                                       (-1, -1, tile[0, 0]),
+                                       (-1, 1, tile[0, -1]),
+                                       (1, -1, tile[-1, 0]),
+                                       (1, 1, tile[-1, -1])):
+                if border:
+                    active.add(self._neighbor(tile_row, tile_col,
+                                              drow, dcol))
+
+        # Tiles that end up empty are not stored anymore
+        new_tiles = {}
+        for key in active:
+            tile = self._step_tile(*key)
+            if tile is not None:
+                new_tiles[key] = tile
+        self.tiles = new_tiles
+        self._owned = set(new_tiles)
+
+    def _step_tile(self, tile_row, tile_col):
+        """Computes the next generation of a tile. Returns None if it has no
+        live cells.
+        """
+        height, width = self._tile_shape(tile_row, tile_col)
+
+        # Fill the padded buffer with the tile and the facing edges of its
+        # neighbors
+        padded = self._padded[:height + 2, :width + 2]
+        padded.fill(0)
+        for drow in (-1, 0, 1):
+            for dcol in (-1, 0, 1):
+                neighbor = self.tiles.get(self._neighbor(tile_row, tile_col,
+                                                         drow, dcol))
+                if neighbor is not None:
+                    padded[DST_SLICES[drow], DST_SLICES[dcol]] = \
+                        neighbor[SRC_SLICES[drow], SRC_SLICES[dcol]]
+
+        # Count the neighbors by summing the eight shifted views of the
+        # padded tile
+        neighbors = self._neighbors[:height, :width]
+        neighbors.fill(0)
+        for drow in range(3):
+            for dcol in range(3):
+                if (drow, dcol) != (1, 1):
+                    neighbors += padded[drow:drow + height,
+                                        dcol:dcol + width]
+
+        # New live cells are the cells with exactly 3 neighbors, and the
+        # live cells with exactly 2 neighbors
+        new_tile = np.uint8(neighbors == 2)
+        new_tile &= padded[1:-1, 1:-1]
+        new_tile |= neighbors == 3
+
+        return new_tile if new_tile.any() else None
+
+    def _window(self, row, col, height, width):
+        """Returns the cells of the specified region, wrapping around the
+        edges of the torus.
+        """
+        rows = np.arange(row, row + height) % self.height
+        cols = np.arange(col, col + width) % self.width
+        window = np.zeros((height, width), dtype=np.uint8)
+
+        tile_rows, tile_cols = rows // self.tile_size, cols // self.tile_size
+        for tile_row in np.unique(tile_rows):
+            in_rows = tile_rows == tile_row
+            for tile_col in np.unique(tile_cols):
+                tile = self.tiles.get((tile_row, tile_col))
+                if tile is None:
+                    continue
+                in_cols = tile_cols == tile_col
+                window[np.ix_(in_rows, in_cols)] = tile[np.ix_(
+                    rows[in_rows] % self.tile_size,
+                    cols[in_cols] % self.tile_size)]
+
+        return window
+
+    def block_population(self, row, col, height, width, zoom):
+        """Returns the number of live cells in each zoom x zoom block of the
+        specified region, as an array indexed by [row, col] of the block.
+
+        Only the live cells of the stored tiles are counted, so that zooming
+        out on a huge, mostly empty torus is cheap.
+        """
+        blocks = np.zeros((height, width), dtype=np.int32)
+        for (tile_row, tile_col), tile in self.tiles.items():
+            rows, cols = tile.nonzero()
+            rows = (rows + tile_row * self.tile_size - row) % self.height
+            cols = (cols + tile_col * self.tile_size - col) % self.width
+
+            # The region may go around the torus more than once
+            for row_offset in range(0, height * zoom, self.height):
+                for col_offset in range(0, width * zoom, self.width):
+                    block_rows = (rows + row_offset) // zoom
+                    block_cols = (cols + col_offset) // zoom
+                    inside = (block_rows < height) & (block_cols < width)
+                    np.add.at(blocks, (block_rows[inside], block_cols[inside]),
+                              1)
+        return blocks
+
+    def _snapshot(self):
+        """Returns a Snapshot of the current state of the game. The tiles are
+        assembled into a read-only array of the whole grid, which is a copy.
+        """
+        return Snapshot(self.generation,
+                        readonly(self._window(0, 0, self.height, self.width)),
+                        None, None, None)
+
+    def fate(self, row, col):
+        """Returns the fate of the cell at the specified location."""
+        fates, _ = self.region(row, col, 1, 1)
+        return fates[0, 0]
+
+    def age(self, row, col):
+        """Returns the age of a cell, i.e. how many generations it's been in
+        its current state (dead or alive).
+        """
+
+        # The tiled implementation does not know the ages, so it cheats and
+        # returns a constant value.
+        return 1000
+
+    def region(self, row, col, height, width):
+        """Returns the fates and ages of the cells in the specified region, as
+        a pair of arrays indexed by [row, col] relative to the region's top
+        left corner. The region wraps around the edges of the torus.
+        """
+        window = self._window(row - 1, col - 1, height + 2, width + 2)
+        fates = BaseGameNumPy._fates_from_window(window)
+        ages = np.empty((height, width), dtype=np.int64)
+        ages.fill(1000)
+        return fates, ages
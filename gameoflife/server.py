@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module provides a server that runs a single game and streams it to
+any number of viewers, and the client side of the protocol (RemoteGame),
+which can be viewed with the curses UI like a local game.
+
+The server is started with the gameoflife-server command, and viewers with
+gameoflife-viewer. It requires Python 3.
+
+The protocol is made of JSON objects, one per line. On connection, the
+server sends the size of the grid and the current generation:
+
+    {"width": 100, "height": 100, "generation": 1}
+
+Then the client sends the region it wants to see, whenever it changes:
+
+    {"viewport": [row, col, height, width]}
+
+Row and column must be non-negative integers, and height and width positive
+ones. Regions larger than the grid are clamped to its size, and invalid
+viewports are answered with an error, the previous viewport being kept:
+
+    {"error": "..."}
+
+and the server sends frames: the first frame after each viewport change is
+full, and the next ones only hold the cells that changed since the previous
+frame sent to that client. Ages are sent as buckets (see AGE_BUCKETS), so
+that a cell only changes when its appearance does.
+
+    {"generation": 42, "viewport": [...], "full": true,
+     "fates": "0120...", "buckets": "3301..."}
+    {"generation": 43, "viewport": [...], "full": false,
+     "changes": [index, fate, bucket, index, fate, bucket, ...]}
+
+where index is row * width + col, relative to the viewport. Frames are only
+sent as fast as each client reads them: while a client is behind, the
+generations it missed are merged into its next frame.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import asyncio
+import json
+import logging
+import select
+import socket
+from argparse import ArgumentParser
+
+import numpy as np
+
+from gameoflife import engines
+from gameoflife.ages import AGE_BUCKETS, age_buckets
+from gameoflife.gameoflife import GameOfLife, Fate
+
+
+"""Default TCP port of the server."""
+DEFAULT_PORT = 7272
+
+logger = logging.getLogger(__name__)
+
+
+def encode(message):
+    """Encodes a message as a line of JSON."""
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def digits(array):
+    """Encodes an array of small integers as a string of digits."""
+    return (array.ravel() + ord('0')).astype(np.uint8).tobytes() \
+        .decode('ascii')
+
+
+def from_digits(string, shape):
+    """Decodes a string of digits made by digits()."""
+    return (np.frombuffer(string.encode('ascii'), dtype=np.uint8) -
+            ord('0')).reshape(shape)
+
+
+class Viewer(object):
+    """State of a client, as seen by the server."""
+
+    def __init__(self):
+        self.viewport = None
+
+        # Fates and age buckets of the last frame sent to the client, or None
+        # if the next frame must be full
+        self.fates = self.buckets = None
+        self.generation = None
+
+        # Set whenever there may be something new to send
+        self.wakeup = asyncio.Event()
+
+    def set_viewport(self, row, col, height, width):
+        """Changes the viewport. The next frame will be full."""
+        self.viewport = (row, col, height, width)
+        self.fates = self.buckets = None
+        self.wakeup.set()
+
+    def frame(self, game):
+        """Returns the next frame to send to the client, or None if nothing
+        changed since the last one.
+        """
+        fates, ages = game.region(*self.viewport)
+        fates = np.asarray(fates, dtype=np.uint8)
+        buckets = age_buckets(np.asarray(ages)).astype(np.uint8)
+
+        frame = {'generation': game.generation,
+                 'viewport': list(self.viewport)}
+        if self.fates is None:
+            frame.update(full=True, fates=digits(fates),
+                         buckets=digits(buckets))
+        else:
+            changed = np.flatnonzero((fates != self.fates) |
+                                     (buckets != self.buckets))
+            if not len(changed) and game.generation == self.generation:
+                return None
+            changes = np.empty((len(changed), 3), dtype=np.int64)
+            changes[:, 0] = changed
+            changes[:, 1] = fates.ravel()[changed]
+            changes[:, 2] = buckets.ravel()[changed]
+            frame.update(full=False, changes=changes.ravel().tolist())
+
+        self.fates, self.buckets = fates, buckets
+        self.generation = game.generation
+        return frame
+
+
+class ViewerServer(object):
+    """Server running a game and streaming it to viewers.
+
+    The game advances at speed generations per second (0 pauses it), in the
+    same thread as the server, so that frames are never computed in the
+    middle of a generation.
+    """
+
+    # Maximum number of frames per second sent to each client
+    MAX_FPS = 30.0
+
+    # Bytes queued for a client before the server waits for it to catch up
+    WRITE_BUFFER = 64 * 1024
+
+    def __init__(self, game, speed=10.0):
+        """Creates a new server for the specified game."""
+        self.game = game
+        self.speed = speed
+        self.viewers = set()
+        self._server = None
+        self._runner = None
+        self._handlers = {}
+
+    async def start(self, host='', port=DEFAULT_PORT):
+        """Starts listening and running the game. Port 0 picks any free port
+        (see the address attribute).
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.address = self._server.sockets[0].getsockname()[:2]
+        self._runner = asyncio.ensure_future(self._run())
+
+    async def serve_forever(self):
+        """Runs until cancelled."""
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stops the server and the game, and disconnects the clients."""
+        self._runner.cancel()
+        self._server.close()
+        handlers = list(self._handlers)
+        for writer in self._handlers.values():
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def step(self):
+        """Computes the next generation, and lets the viewers know."""
+        self.game.next_generation()
+        for viewer in self.viewers:
+            viewer.wakeup.set()
+
+    async def _run(self):
+        """Advances the game at the requested speed."""
+        loop = asyncio.get_event_loop()
+        next_time = loop.time()
+        while True:
+            if self.speed <= 0:
+                await asyncio.sleep(0.1)
+                next_time = loop.time()
+                continue
+            self.step()
+            next_time = max(next_time + 1.0 / self.speed, loop.time())
+            await asyncio.sleep(next_time - loop.time())
+
+    async def _handle(self, reader, writer):
+        """Serves a client: reads its viewport changes, while frames are
+        sent by another task.
+        """
+        writer.transport.set_write_buffer_limits(high=self.WRITE_BUFFER)
+        writer.write(encode({'width': self.game.width,
+                             'height': self.game.height,
+                             'generation': self.game.generation}))
+
+        viewer = Viewer()
+        self.viewers.add(viewer)
+        self._handlers[asyncio.current_task()] = writer
+        sender = asyncio.ensure_future(self._send_frames(viewer, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line.decode('utf-8'))
+                if 'viewport' in message:
+                    try:
+                        viewport = self._check_viewport(message['viewport'])
+                    except ValueError as e:
+                        writer.write(encode({'error': str(e)}))
+                        continue
+                    viewer.set_viewport(*viewport)
+        except (ConnectionError, ValueError, TypeError):
+            # Disconnected, or not speaking the protocol
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            self._handlers.pop(asyncio.current_task(), None)
+            sender.cancel()
+            writer.close()
+
+    def _check_viewport(self, viewport):
+        """Returns a viewport sent by a client, with its height and width
+        clamped to the size of the grid. Raises ValueError if it is invalid.
+        """
+        if not isinstance(viewport, list) or len(viewport) != 4 or \
+                not all(isinstance(value, int) and
+                        not isinstance(value, bool) for value in viewport):
+            raise ValueError('viewport must be a list of 4 integers')
+        row, col, height, width = viewport
+        if row < 0 or col < 0:
+            raise ValueError('viewport row and column must not be negative')
+        if height < 1 or width < 1:
+            raise ValueError('viewport height and width must be positive')
+        return (row % self.game.height, col % self.game.width,
+                min(height, self.game.height), min(width, self.game.width))
+
+    async def _send_frames(self, viewer, writer):
+        """Sends frames to a client, as fast as it reads them."""
+        loop = asyncio.get_event_loop()
+        try:
+            while True:
+                await viewer.wakeup.wait()
+                viewer.wakeup.clear()
+                if viewer.viewport is None:
+                    continue
+
+                start = loop.time()
+                try:
+                    frame = viewer.frame(self.game)
+                except Exception:
+                    # Keep streaming: the next viewport may be fine
+                    logger.exception('failed to compute a frame for %s',
+                                     writer.get_extra_info('peername'))
+                    frame = None
+                if frame is not None:
+                    writer.write(encode(frame))
+
+                    # Wait while the client is behind. Generations computed in
+                    # the meantime only wake the viewer up once, and end up in
+                    # a single frame.
+                    await writer.drain()
+
+                await asyncio.sleep(max(0.0, 1.0 / self.MAX_FPS -
+                                        (loop.time() - start)))
+        except ConnectionError:
+            pass
+
+
+class RemoteGame(GameOfLife):
+    """Game running on a server, as seen by a viewer.
+
+    The server computes the generations, so next_generation() and reset()
+    only process the frames received in the meantime, and region() returns
+    the last frame received.
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT):
+        """Connects to the server."""
+        self._sock = socket.create_connection((host, port))
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer = b''
+        self._messages = []
+
+        # Wait for the server to tell the size of the grid
+        while not self._messages:
+            self._receive(None)
+        hello = self._messages.pop(0)
+        super(RemoteGame, self).__init__(hello['width'], hello['height'])
+        self.generation = hello['generation']
+
+    def _init(self):
+        """Initializes the internal structures used by the implementation."""
+        self.viewport = None
+        self._frame_viewport = None
+        self._fates = np.zeros((0, 0), dtype=np.uint8)
+        self._ages = np.zeros((0, 0), dtype=np.int64)
+
+    def close(self):
+        """Disconnects from the server."""
+        self._sock.close()
+
+    def reset(self):
+        """Does nothing: the game can only be reset on the server."""
+        self.poll()
+
+    def populate_random(self, prob=0.5, seed=None):
+        """Does nothing: the game can only be populated on the server."""
+        pass
+
+    def next_generation(self):
+        """Processes the frames received from the server."""
+        self.poll()
+
+    def _receive(self, timeout):
+        """Waits up to timeout seconds (forever if None) for data from the
+        server, and splits it into messages.
+        """
+        readable, _, _ = select.select([self._sock], [], [], timeout)
+        if not readable:
+            return
+        data = self._sock.recv(1024 * 1024)
+        if not data:
+            raise IOError('disconnected from the server')
+        lines = (self._buffer + data).split(b'\n')
+        self._buffer = lines.pop()
+        self._messages.extend(json.loads(line.decode('utf-8'))
+                              for line in lines)
+
+    def poll(self, timeout=0.0):
+        """Processes the frames received from the server, waiting up to
+        timeout seconds for one if none was received yet.
+        """
+        self._receive(timeout)
+        while True:
+            # Read everything available without waiting
+            count = len(self._messages)
+            self._receive(0.0)
+            if len(self._messages) == count:
+                break
+
+        for frame in self._messages:
+            if 'viewport' not in frame:
+                # Error about a viewport
+                continue
+            viewport = tuple(frame['viewport'])
+            shape = viewport[2:]
+            if frame['full']:
+                fates = from_digits(frame['fates'], shape)
+                ages = AGE_BUCKETS[from_digits(frame['buckets'], shape)]
+            elif viewport == self._frame_viewport:
+                fates, ages = self._fates.ravel(), self._ages.ravel()
+                changes = np.array(frame['changes'],
+                                   dtype=np.int64).reshape(-1, 3)
+                fates[changes[:, 0]] = changes[:, 1]
+                ages[changes[:, 0]] = AGE_BUCKETS[changes[:, 2]]
+                fates, ages = fates.reshape(shape), ages.reshape(shape)
+            else:
+                # Changes for a viewport that was replaced since
+                continue
+            self._fates, self._ages = fates, ages
+            self._frame_viewport = viewport
+            self.generation = frame['generation']
+        self._messages = []
+
+    def region(self, row, col, height, width):
+        """Returns the fates and ages of the cells in the specified region, as
+        a pair of arrays indexed by [row, col] relative to the region's top
+        left corner, as received from the server.
+
+        If the region isn't the one received last, the server is asked for
+        it, and the cells received last are returned in the meantime.
+        """
+        viewport = (row % self.height, col % self.width, height, width)
+        if viewport != self.viewport:
+            self._sock.sendall(encode({'viewport': list(viewport)}))
+            self.viewport = viewport
+        self.poll()
+
+        if self._fates.shape == (height, width):
+            return self._fates, self._ages
+
+        # The server clamps regions larger than the grid, which wrap around
+        # the torus anyway
+        if self._frame_viewport == (viewport[0], viewport[1],
+                                    min(height, self.height),
+                                    min(width, self.width)):
+            rows, cols = np.arange(height), np.arange(width)
+            fates = self._fates.take(rows, axis=0, mode='wrap')
+            ages = self._ages.take(rows, axis=0, mode='wrap')
+            return (fates.take(cols, axis=1, mode='wrap'),
+                    ages.take(cols, axis=1, mode='wrap'))
+        fates = np.zeros((height, width), dtype=np.uint8)
+        ages = np.zeros((height, width), dtype=np.int64)
+        ages.fill(AGE_BUCKETS[-1])
+        return fates, ages
+
+    def fate(self, row, col):
+        """Returns the fate of the cell at the specified location, if it is
+        in the region received last.
+        """
+        row, col = self._frame_index(row, col)
+        return self._fates[row, col] if row is not None else Fate.StayDead
+
+    def age(self, row, col):
+        """Returns the age of the cell at the specified location, if it is in
+        the region received last. Ages are only known up to their bucket (see
+        AGE_BUCKETS).
+        """
+        row, col = self._frame_index(row, col)
+        return self._ages[row, col] if row is not None else AGE_BUCKETS[-1]
+
+    def _frame_index(self, row, col):
+        """Returns the location of a cell in the region received last, or
+        (None, None) if it isn't in it.
+        """
+        if self._frame_viewport is None:
+            return None, None
+        top, left, height, width = self._frame_viewport
+        row, col = (row - top) % self.height, (col - left) % self.width
+        if row < height and col < width:
+            return row, col
+        return None, None
+
+
+def main():
+    """Entry point for gameoflife-server."""
+    parser = ArgumentParser(prog='gameoflife-server',
+                            description="Serves a Game of Life to "
+                                        "gameoflife-viewer clients",
+                            add_help=False)
+    parser.add_argument('--impl', '-i', type=str, default='numpy',
+                        help='game implementation (default: numpy)')
+    parser.add_argument('--width', '-w', type=int, default=100,
+                        help='grid width')
+    parser.add_argument('--height', '-h', type=int, default=100,
+                        help='grid height')
+    parser.add_argument('--prob', '-p', type=float, default=0.5,
+                        help='initial population probability')
+    parser.add_argument('--speed', '-s', type=float, default=10.0,
+                        help='generations per second (default: 10)')
+    parser.add_argument('--host', type=str, default='',
+                        help='address to listen on (default: all)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='port to listen on (default: {})'
+                             .format(DEFAULT_PORT))
+    parser.add_argument('--help', action='help',
+                        help='show this help message and exit')
+    args = parser.parse_args()
+
+    try:
+        engine = engines.get(args.impl)
+    except KeyError:
+        parser.error('unknown implementation {} (choose from {})'
+                     .format(args.impl, ', '.join(engines.names())))
+    for module in engine.missing():
+        parser.error("can't find {0} module. "
+                     "Check if it is installed correctly.".format(module))
+    game = engine.load()(args.width, args.height)
+    game.populate_random(args.prob)
+    server = ViewerServer(game, args.speed)
+
+    async def serve():
+        await server.start(args.host, args.port)
+        print('Serving on {}:{}'.format(args.host or '*', server.address[1]))
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""This module contains the entry point for gameoflife-soup, a batch tool
+that runs seeded random soups until they stabilize and takes a census of the
+objects they leave behind. To invoke it, just call gameoflife.soup.main().
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import json
+import multiprocessing
+import time
+from argparse import ArgumentParser
+from collections import Counter
+
+import numpy as np
+from scipy import ndimage
+
+from gameoflife import __version__
+from gameoflife.gamenumpy import GameNumPyLight
+
+
+"""Maximum period looked for when classifying an object."""
+MAX_PERIOD = 32
+
+"""A few well-known objects, used to give names to the census entries."""
+KNOWN_OBJECTS = {'block': ['11',
+                           '11'],
+                 'beehive': ['0110',
+                             '1001',
+                             '0110'],
+                 'loaf': ['0110',
+                          '1001',
+                          '0101',
+                          '0010'],
+                 'boat': ['110',
+                          '101',
+                          '010'],
+                 'ship': ['110',
+                          '101',
+                          '011'],
+                 'tub': ['010',
+                         '101',
+                         '010'],
+                 'pond': ['0110',
+                          '1001',
+                          '1001',
+                          '0110'],
+                 'blinker': ['111'],
+                 'toad': ['0111',
+                          '1110'],
+                 'beacon': ['1100',
+                            '1100',
+                            '0011',
+                            '0011'],
+                 'glider': ['010',
+                            '001',
+                            '111'],
+                 'lwss': ['01001',
+                          '10000',
+                          '10001',
+                          '11110']}
+
+_names = None  # canonical code -> name, computed on first use
+
+
+def step_plane(cells):
+    """Computes the next generation of a pattern on an infinite plane.
+
+    Returns the new cells, cropped to their bounding box, and the offset of
+    the new bounding box relative to the old one.
+    """
+
+    # The pattern can grow by at most one cell in each direction
+    padded = np.pad(cells, 2, mode='constant')
+    con = 10 * padded[1:-1, 1:-1]
+    for drow in range(3):
+        for dcol in range(3):
+            if (drow, dcol) != (1, 1):
+                con = con + padded[drow:drow + con.shape[0],
+                                   dcol:dcol + con.shape[1]]
+    new_cells = np.int8((con == 3) | (con == 12) | (con == 13))
+
+    rows, cols = np.nonzero(new_cells)
+    if len(rows) == 0:
+        return new_cells[:0, :0], (0, 0)
+    row0, col0 = rows.min(), cols.min()
+    new_cells = new_cells[row0:rows.max() + 1, col0:cols.max() + 1]
+    return new_cells, (row0 - 1, col0 - 1)
+
+
+def canonical_code(phases):
+    """Returns a code identifying a pattern regardless of its phase,
+    orientation and position.
+    """
+    candidates = []
+    for phase in phases:
+        for transposed in (phase, phase.T):
+            for rotated in (transposed, transposed[::-1],
+                            transposed[:, ::-1], transposed[::-1, ::-1]):
+                height, width = rotated.shape
+                rows = '.'.join('{:x}'.format(int(''.join(map(str, row)), 2))
+                                for row in rotated.tolist())
+                candidates.append((height, width, rows))
+    height, width, rows = min(candidates)
+    return '{}x{}_{}'.format(height, width, rows)
+
+
+def classify(cells, max_period=MAX_PERIOD):
+    """Classifies an isolated pattern, given as an array cropped to its
+    bounding box.
+
+    Returns a census code: 'xs' followed by the population for still lifes,
+    'xp' followed by the period for oscillators, 'xq' followed by the period
+    for spaceships, and 'zz' for anything else (e.g. patterns that don't
+    settle in max_period generations).
+    """
+    phases = [cells]
+    current = cells
+    drift_row, drift_col = 0, 0
+
+    for period in range(1, max_period + 1):
+        current, (drow, dcol) = step_plane(current)
+        drift_row, drift_col = drift_row + drow, drift_col + dcol
+
+        if current.size == 0:
+            break
+
+        if current.shape == cells.shape and np.array_equal(current, cells):
+            code = canonical_code(phases)
+            if (drift_row, drift_col) != (0, 0):
+                return 'xq{}_{}'.format(period, code)
+            elif period == 1:
+                return 'xs{}_{}'.format(int(cells.sum()), code)
+            else:
+                return 'xp{}_{}'.format(period, code)
+
+        phases.append(current)
+
+    return 'zz_{}'.format(canonical_code([cells]))
+
+
+def object_name(code):
+    """Returns the name of a census entry, or its code if it is not one of
+    the well-known objects.
+    """
+    global _names
+
+    if _names is None:
+        _names = {}
+        for name, rows in KNOWN_OBJECTS.items():
+            cells = np.array([[int(c) for c in row] for row in rows],
+                             dtype=np.int8)
+            _names[classify(cells)] = name
+
+    return _names.get(code, code)
+
+
+def find_objects(cells):
+    """Splits the cells of a torus into separate objects.
+
+    Cells that are close enough to interact (less than 3 cells apart) belong
+    to the same object. Returns a list of arrays, each containing an object
+    cropped to its bounding box.
+    """
+    height, width = cells.shape
+    live = cells != 0
+
+    # Group live cells through their neighborhoods, wrapping around the edges
+    near = ndimage.maximum_filter(live, size=3, mode='wrap')
+    labels, num_labels = ndimage.label(near, structure=np.ones((3, 3)))
+    if num_labels == 0:
+        return []
+
+    # Labels don't wrap around the edges, so merge those that touch across
+    # the seams of the torus
+    parents = np.arange(num_labels + 1)
+
+    def root(label):
+        while parents[label] != label:
+            parents[label] = parents[parents[label]]
+            label = parents[label]
+        return label
+
+    for shift in (-1, 0, 1):
+        pairs = [(labels[-1], np.roll(labels[0], shift)),
+                 (labels[:, -1], np.roll(labels[:, 0], shift))]
+        for first, second in pairs:
+            touching = (first != 0) & (second != 0)
+            for a, b in set(zip(first[touching], second[touching])):
+                ra, rb = root(a), root(b)
+                if ra != rb:
+                    parents[max(ra, rb)] = min(ra, rb)
+
+    roots = np.array([root(label) for label in range(num_labels + 1)])
+
+    # Gather the live cells of each object
+    rows, cols = np.nonzero(live)
+    owners = roots[labels[rows, cols]]
+    order = np.argsort(owners, kind='mergesort')
+    rows, cols, owners = rows[order], cols[order], owners[order]
+    bounds = np.nonzero(np.diff(owners))[0] + 1
+
+    objects = []
+    for obj_rows, obj_cols in zip(np.split(rows, bounds),
+                                  np.split(cols, bounds)):
+        # Unwrap objects that straddle a seam
+        if obj_rows.max() - obj_rows.min() > height // 2:
+            obj_rows = np.where(obj_rows < height // 2,
+                                obj_rows + height, obj_rows)
+        if obj_cols.max() - obj_cols.min() > width // 2:
+            obj_cols = np.where(obj_cols < width // 2,
+                                obj_cols + width, obj_cols)
+
+        obj = np.zeros((obj_rows.max() - obj_rows.min() + 1,
+                        obj_cols.max() - obj_cols.min() + 1), dtype=np.int8)
+        obj[obj_rows - obj_rows.min(), obj_cols - obj_cols.min()] = 1
+        objects.append(obj)
+
+    return objects
+
+
+_game = None  # engine reused by all soups run in a worker process
+
+
+def init_worker(width, height):
+    """Initializes a worker process, preallocating its engine."""
+    global _game
+    _game = GameNumPyLight(width, height)
+
+
+def run_soup(task):
+    """Runs a single soup until it stabilizes, and takes a census of the
+    objects it leaves behind.
+
+    task is a tuple (seed, prob, max_gens). Returns a dict describing the
+    outcome, suitable for JSON serialization.
+    """
+    seed, prob, max_gens = task
+    game = _game
+
+    # Populate the preallocated grid in place
+    game.generation = 1
+    game.populate_random(prob, seed)
+
+    # Run until a previously seen state comes back. States are keyed on the
+    # packed cells themselves, so that a hash collision can't be taken for a
+    # cycle.
+    seen = {}
+    period = None
+    while game.generation <= max_gens:
+        key = np.packbits(game.cells).tobytes()
+        if key in seen:
+            period = game.generation - seen[key]
+            break
+        seen[key] = game.generation
+        game.next_generation()
+
+    census = Counter(classify(obj) for obj in find_objects(game.cells))
+
+    return {'seed': seed,
+            'generations': game.generation,
+            'period': period,
+            'population': int(game.cells.sum()),
+            'objects': dict(census)}
+
+
+def main():
+    """Entry point for gameoflife-soup."""
+
+    # Command line argument parser
+    parser = ArgumentParser(prog='gameoflife-soup',
+                            description='Random soup search for '
+                                        "Conway's Game of Life",
+                            epilog='Suggestions and bug reports are greatly '
+                                   'appreciated: '
+                                   'https://github.com/wlof/gameoflife/issues',
+                            add_help=False)
+    parser.add_argument('--count', '-n', type=int, default=100,
+                        help='number of soups')
+    parser.add_argument('--seed', '-s', type=int, default=0,
+                        help='seed of the first soup')
+    parser.add_argument('--width', '-w', type=int, default=64,
+                        help='grid width')
+    parser.add_argument('--height', '-h', type=int, default=64,
+                        help='grid height')
+    parser.add_argument('--prob', '-p', type=float, default=0.5,
+                        help='initial population probability')
+    parser.add_argument('--max-gens', '-g', type=int, default=10000,
+                        help='maximum number of generations per soup')
+    parser.add_argument('--jobs', '-j', type=int,
+                        default=multiprocessing.cpu_count(),
+                        help='number of worker processes')
+    parser.add_argument('--output', '-o', type=str,
+                        default='soup_results.jsonl',
+                        help='results file (one JSON object per soup)')
+
+    parser.add_argument('--version', action='version', version=__version__)
+    parser.add_argument('--help', action='help',
+                        help='show this help message and exit')
+
+    # Parse args
+    args = parser.parse_args()
+
+    if args.count <= 0:
+        parser.error('count needs to be a positive integer')
+    if args.width <= 0:
+        parser.error('width needs to be a positive integer')
+    if args.height <= 0:
+        parser.error('height needs to be a positive integer')
+    if not 0.0 <= args.prob <= 1.0:
+        parser.error('probability needs to be between 0.0 and 1.0')
+    if args.max_gens <= 0:
+        parser.error('max-gens needs to be a positive integer')
+    if args.jobs <= 0:
+        parser.error('jobs needs to be a positive integer')
+
+    tasks = [(seed, args.prob, args.max_gens)
+             for seed in range(args.seed, args.seed + args.count)]
+    census = Counter()
+    unstable = 0
+
+    start = time.time()
+    pool = multiprocessing.Pool(args.jobs, init_worker,
+                                (args.width, args.height))
+    try:
+        with open(args.output, 'w') as output:
+            # Stream the results as they come
+            results = pool.imap_unordered(run_soup, tasks,
+                                          chunksize=max(1, args.count //
+                                                        (args.jobs * 16)))
+            for result in results:
+                output.write(json.dumps(result, sort_keys=True) + '\n')
+                census.update(result['objects'])
+                if result['period'] is None:
+                    unstable += 1
+    finally:
+        pool.terminate()
+    elapsed = time.time() - start
+
+    # Summary
+    print('{} soups in {:.2f}s: {:.1f} soups/sec, {:.1f} soups/sec/core'
+          .format(args.count, elapsed, args.count / elapsed,
+                  args.count / elapsed / args.jobs))
+    if unstable:
+        print('{} soups did not stabilize within {} generations'
+              .format(unstable, args.max_gens))
+    for code, count in census.most_common():
+        print('{:>10}  {}'.format(count, object_name(code)))
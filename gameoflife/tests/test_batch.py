@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+from unittest import TestCase, TestSuite, TestLoader, TextTestRunner
+
+import numpy as np
+
+from gameoflife.gamebatch import GameNumPyBatch
+from gameoflife.gamenumpy import GameNumPyLight
+
+
+class GameNumPyBatchTestCase(TestCase):
+    def setUp(self):
+        self.batch = GameNumPyBatch(6, 11, 8)
+
+    def test_same_as_single_games(self):
+        self.batch.populate_random(np.linspace(0.2, 0.7, 6), seed=1)
+
+        games = []
+        for cells in self.batch.cells:
+            game = GameNumPyLight(11, 8)
+            game.cells[...] = cells
+            games.append(game)
+
+        for _ in range(20):
+            self.batch.next_generation()
+            for game in games:
+                game.next_generation()
+            for cells, idx in zip(self.batch.cells, self.batch.ids):
+                self.assertTrue(np.array_equal(cells, games[idx].cells))
+                self.assertEqual(self.batch.populations[idx],
+                                 games[idx].cells.sum())
+
+    def test_populate_seed(self):
+        # Universes get the grids of single games with consecutive seeds
+        self.batch.populate_random(0.4, seed=10)
+        for idx, cells in enumerate(self.batch.cells):
+            game = GameNumPyLight(11, 8)
+            game.populate_random(0.4, seed=10 + idx)
+            self.assertTrue(np.array_equal(cells, game.cells))
+
+    def test_stabilized_drop_out(self):
+        cells = self.batch.cells
+        cells[0, 2:4, 2:4] = 1  # block
+        cells[1, 3, 2:5] = 1    # blinker
+        cells[2, 0:3, 0:3] = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]  # glider
+
+        self.batch.run(10)
+        self.assertEqual(list(self.batch.periods), [1, 2, 0, 1, 1, 1])
+        self.assertEqual(list(self.batch.ids), [2])
+        self.assertEqual(self.batch.populations[1], 3)
+        self.assertEqual(self.batch.generation, 10)
+
+    def test_populate_after_drop_out(self):
+        self.batch.populate_random(0.3, seed=1)
+        self.batch.run(200)
+        self.assertTrue(self.batch.active < self.batch.batch)
+
+        # A new run starts over with all the universes
+        self.batch.populate_random(0.4, seed=10)
+        self.assertEqual(self.batch.generation, 1)
+        self.assertEqual(list(self.batch.ids), list(range(6)))
+        self.assertEqual(list(self.batch.periods), [0] * 6)
+        self.assertEqual(list(self.batch.stabilized_at), [0] * 6)
+        for idx, cells in enumerate(self.batch.cells):
+            game = GameNumPyLight(11, 8)
+            game.populate_random(0.4, seed=10 + idx)
+            self.assertTrue(np.array_equal(cells, game.cells))
+            self.assertEqual(self.batch.populations[idx], game.cells.sum())
+
+
+def suite():
+    suite = TestSuite()
+    suite.addTest(TestLoader().loadTestsFromTestCase(GameNumPyBatchTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    TextTestRunner().run(suite())
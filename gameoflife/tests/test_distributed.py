@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import threading
+from unittest import TestCase, TestSuite, TestLoader, TextTestRunner
+
+import numpy as np
+
+from gameoflife.distributed import GameDistributed, make_server
+from gameoflife.gamenumpy import GameNumPy
+from gameoflife.tests.test_engines import (random_pattern, load_pattern,
+                                           count_blocks)
+
+
+WIDTH, HEIGHT = 17, 11
+GENERATIONS = 12
+
+
+class GameDistributedTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Two worker servers on localhost, each computing several blocks
+        cls.servers = [make_server('127.0.0.1', 0) for _ in range(2)]
+        for server in cls.servers:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.daemon = True
+            thread.start()
+        cls.addresses = [server.server_address for server in cls.servers]
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers:
+            server.shutdown()
+            server.server_close()
+
+    def setUp(self):
+        self.pattern = random_pattern(WIDTH, HEIGHT)
+        self.reference = GameNumPy(WIDTH, HEIGHT)
+        load_pattern(self.reference, self.pattern)
+
+    def create_game(self, ghost, grid):
+        workers = [self.addresses[i % 2] for i in range(grid[0] * grid[1])]
+        game = GameDistributed(WIDTH, HEIGHT, workers, ghost, grid)
+        self.addCleanup(game.close)
+        game.load(np.array(self.pattern, dtype=np.uint8))
+        return game
+
+    def check_generations(self, game):
+        for _ in range(GENERATIONS):
+            self.assertTrue(np.array_equal(game.cells, self.reference.cells))
+            game.next_generation()
+            self.reference.next_generation()
+
+        # Region across the seams of the torus and of the blocks
+        fates, _ = game.region(HEIGHT - 2, WIDTH - 3, 5, 7)
+        ref_fates, _ = self.reference.region(HEIGHT - 2, WIDTH - 3, 5, 7)
+        self.assertTrue(np.array_equal(fates, ref_fates))
+        self.assertEqual(game.fate(0, 0), self.reference.fate(0, 0))
+
+        # Blocks going around the torus more than once
+        self.assertEqual(game.block_population(1, 2, 4, 5, 4).tolist(),
+                         count_blocks(self.reference.cells, 1, 2, 4, 5, 4))
+
+    def test_stripes(self):
+        self.check_generations(self.create_game(1, (2, 1)))
+
+    def test_blocks(self):
+        self.check_generations(self.create_game(1, (2, 3)))
+
+    def test_ghost_zone(self):
+        # Blocks only synchronize every 3 generations
+        self.check_generations(self.create_game(3, (3, 2)))
+
+    def test_iter_generations(self):
+        game = self.create_game(2, (2, 2))
+        for snapshot in game.iter_generations(3, every=2):
+            for _ in range(2):
+                self.reference.next_generation()
+            self.assertEqual(snapshot.generation, self.reference.generation)
+            self.assertTrue(np.array_equal(snapshot.cells,
+                                           self.reference.cells))
+
+    def test_synchronizations(self):
+        # With a ghost zone 3 cells wide, the workers are called twice every
+        # 3 generations: for the edges, then for the halos and the step
+        game = self.create_game(3, (3, 2))
+        calls = []
+        call = game._call
+
+        def counting_call(requests):
+            calls.append(requests)
+            return call(requests)
+        game._call = counting_call
+
+        for _ in range(6):
+            game.next_generation()
+            self.reference.next_generation()
+        self.assertEqual(len(calls), 4)
+        self.assertEqual([message['count'] for _, message in calls[-1][6:]],
+                         [3] * 6)
+
+        # Reading the cells computes the pending generations
+        game.next_generation()
+        self.reference.next_generation()
+        self.assertEqual(len(calls), 4)
+        self.assertTrue(np.array_equal(game.cells, self.reference.cells))
+        self.check_generations(game)
+
+    def test_populate_random(self):
+        game = self.create_game(2, (2, 2))
+        game.populate_random(0.5)
+        load_pattern(self.reference, game.cells)
+        self.check_generations(game)
+
+    def test_populate_seed(self):
+        # Same grid as a single game with the same seed
+        game = self.create_game(1, (2, 3))
+        game.populate_random(0.3, seed=5)
+        self.reference.populate_random(0.3, seed=5)
+        self.check_generations(game)
+
+    def test_invalid_grid(self):
+        self.assertRaises(ValueError, GameDistributed, WIDTH, HEIGHT,
+                          self.addresses, 1, (2, 2))
+        self.assertRaises(ValueError, GameDistributed, WIDTH, HEIGHT,
+                          self.addresses, 6, (2, 1))
+
+
+def suite():
+    suite = TestSuite()
+    suite.addTest(TestLoader().loadTestsFromTestCase(GameDistributedTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    TextTestRunner().run(suite())
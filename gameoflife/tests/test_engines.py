@@ -0,0 +1,559 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import copy
+import random
+from itertools import islice
+from unittest import TestCase, TestSuite, TestLoader, TextTestRunner
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+import numpy as np
+
+from gameoflife.gameoflife import GameOfLife
+from gameoflife.gamepython import (GamePython, GamePythonLight,
+                                   GamePythonLazy, GamePythonFlat)
+from gameoflife.gamenumpy import GameNumPy, GameNumPyLight, GameNumPyLazy
+from gameoflife.gamenumba import GameNumba
+from gameoflife.gamememmap import GameMemmap
+from gameoflife.gametiled import GameTiled
+
+
+WIDTH, HEIGHT = 13, 9
+GENERATIONS = 12
+
+
+def random_pattern(width, height, seed=42):
+    """Returns a random grid of cells as a list of rows."""
+    rand = random.Random(seed)
+    return [[1 if rand.random() <= 0.4 else 0 for _ in range(width)]
+            for _ in range(height)]
+
+
+def load_pattern(game, pattern):
+    """Loads a grid of cells into a game, whatever its implementation."""
+    if isinstance(game.cells, np.ndarray):
+        game.cells[...] = np.array(pattern, dtype=np.int8)
+    elif isinstance(game.cells, bytearray):
+        game.cells[:] = bytearray(cell for line in pattern for cell in line)
+    else:
+        for row, line in enumerate(pattern):
+            for col, cell in enumerate(line):
+                game.cells[row][col] = cell
+    if hasattr(game, '_compute_fates'):
+        game._compute_fates()
+    if hasattr(game, 'invalidate_population'):
+        game.invalidate_population()
+
+
+def count_blocks(cells, row, col, height, width, zoom):
+    """Counts the live cells of each block of a region, one cell at a time."""
+    cells = np.array(cells)
+    return [[sum(cells[(row + r * zoom + dr) % cells.shape[0],
+                       (col + c * zoom + dc) % cells.shape[1]]
+                 for dr in range(zoom) for dc in range(zoom))
+             for c in range(width)]
+            for r in range(height)]
+
+
+"""Regions and zoom levels checked by the block population tests. The last
+one goes around the torus more than once on both axes.
+"""
+BLOCK_REGIONS = ((HEIGHT - 2, WIDTH - 3, 3, 4, 2), (1, 2, 4, 5, 4))
+
+"""Regions checked by the population tests: inside the grid, across the
+edges, starting from negative coordinates, empty, and going around the torus
+more than once.
+"""
+POPULATION_REGIONS = ((2, 3, 4, 5), (HEIGHT - 2, WIDTH - 3, 5, 7),
+                      (-4, -20, 3, 6), (3, 3, 0, 5), (0, 0, HEIGHT, WIDTH),
+                      (5, 7, 2 * HEIGHT + 3, 3 * WIDTH + 1))
+
+"""Cells flipped by the fork tests, on the edges and inside the grid."""
+FLIPS = ((0, 0), (HEIGHT - 1, WIDTH - 1), (4, 6), (4, 7), (-1, 3))
+
+
+class EngineTestMixin(object):
+    """Checks that an engine evolves exactly like the reference one."""
+
+    def setUp(self):
+        pattern = random_pattern(WIDTH, HEIGHT)
+        self.reference = GamePython(WIDTH, HEIGHT)
+        self.game = self.cls_game(WIDTH, HEIGHT)
+        load_pattern(self.reference, pattern)
+        load_pattern(self.game, pattern)
+
+    def assertSameState(self, game=None, reference=None):
+        game, reference = game or self.game, reference or self.reference
+        for row in range(HEIGHT):
+            for col in range(WIDTH):
+                self.assertEqual(game.fate(row, col),
+                                 reference.fate(row, col))
+                self.assertEqual(game.age(row, col),
+                                 reference.age(row, col))
+
+    def test_generations(self):
+        for _ in range(GENERATIONS):
+            self.assertSameState()
+            self.reference.next_generation()
+            self.game.next_generation()
+        self.assertSameState()
+
+    def test_region(self):
+        for _ in range(GENERATIONS):
+            self.reference.next_generation()
+            self.game.next_generation()
+
+        # The region overlaps the edges of the torus on both axes
+        fates, ages = self.game.region(HEIGHT - 2, WIDTH - 3, 5, 7)
+        ref_fates, ref_ages = self.reference.region(HEIGHT - 2, WIDTH - 3,
+                                                    5, 7)
+        for row in range(5):
+            for col in range(7):
+                self.assertEqual(fates[row][col], ref_fates[row][col])
+                self.assertEqual(ages[row][col], ref_ages[row][col])
+
+    def test_set_cell(self):
+        for _ in range(3):
+            self.reference.next_generation()
+            self.game.next_generation()
+
+        for row, col in FLIPS:
+            self.reference.flip(row, col)
+            self.game.flip(row, col)
+        self.game.set_cell(1, 1, True)
+        self.reference.set_cell(1, 1, True)
+        self.assertSameState()
+
+        for _ in range(3):
+            self.reference.next_generation()
+            self.game.next_generation()
+            self.assertSameState()
+
+    def test_fork(self):
+        for _ in range(3):
+            self.reference.next_generation()
+            self.game.next_generation()
+
+        fork, reference_fork = self.game.fork(), self.reference.fork()
+        for row, col in FLIPS:
+            fork.flip(row, col)
+            reference_fork.flip(row, col)
+
+        for _ in range(3):
+            self.assertSameState()
+            self.assertSameState(fork, reference_fork)
+            for game in (self.game, self.reference, fork, reference_fork):
+                game.next_generation()
+        self.assertSameState()
+        self.assertSameState(fork, reference_fork)
+
+    def test_block_population(self):
+        for _ in range(3):
+            self.reference.next_generation()
+            self.game.next_generation()
+
+        cells = [[self.reference.cells[row][col] for col in range(WIDTH)]
+                 for row in range(HEIGHT)]
+        for region in BLOCK_REGIONS:
+            expected = count_blocks(cells, *region)
+            self.assertEqual(self.reference.block_population(*region),
+                             expected)
+            self.assertEqual(np.array(self.game.block_population(*region))
+                             .tolist(), expected)
+
+
+class GameNumPyTestCase(EngineTestMixin, TestCase):
+    cls_game = GameNumPy
+
+    def test_fork_shares_state(self):
+        fork = self.game.fork()
+        for name in GameNumPy.STATE:
+            self.assertTrue(getattr(fork, name) is getattr(self.game, name))
+
+        # Shared arrays are read-only, and copied when first written
+        with self.assertRaises(ValueError):
+            fork.cells[0, 0] = 1
+        fork.flip(0, 0)
+        self.assertFalse(fork.cells is self.game.cells)
+        self.assertEqual(fork.cells[0, 0], 1 - self.game.cells[0, 0])
+
+    def test_fork_memory(self):
+        # Forking and flipping a few cells copies no array, and allocates no
+        # buffer: flips are kept aside until the next generation
+        if tracemalloc is None:
+            self.skipTest('tracemalloc requires Python 3')
+        for cls_game in (GameNumPy, GameNumPyLazy):
+            game = cls_game(200, 200)
+            game.populate_random(0.3, seed=1)
+            game.next_generation()
+            reference = copy.deepcopy(game)
+
+            tracemalloc.start()
+            try:
+                fork = game.fork()
+                for row, col in FLIPS:
+                    fork.flip(row, col)
+                    reference.flip(row, col)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            self.assertTrue(peak < 200 * 200)
+            for name in cls_game.STATE:
+                self.assertTrue(np.shares_memory(vars(fork)[name],
+                                                 vars(game)[name]))
+
+            for row, col in FLIPS:
+                self.assertEqual(fork.fate(row, col),
+                                 reference.fate(row, col))
+                self.assertEqual(fork.age(row, col), reference.age(row, col))
+            for _ in range(2):
+                fork.next_generation()
+                reference.next_generation()
+                self.assertTrue(np.array_equal(fork.cells, reference.cells))
+                self.assertTrue(np.array_equal(fork.region(0, 0, 200, 200),
+                                               reference.region(0, 0, 200,
+                                                                200)))
+
+
+class GamePythonLazyTestCase(EngineTestMixin, TestCase):
+    cls_game = GamePythonLazy
+
+
+class GameNumPyLazyTestCase(EngineTestMixin, TestCase):
+    cls_game = GameNumPyLazy
+
+
+class GameNumPySciPyTestCase(EngineTestMixin, TestCase):
+    cls_game = GameNumPy
+
+    def setUp(self):
+        super(GameNumPySciPyTestCase, self).setUp()
+        self.game.use_scipy = True
+
+
+class GameNumbaTestCase(EngineTestMixin, TestCase):
+    cls_game = GameNumba
+
+
+class GamePythonFlatTestCase(EngineTestMixin, TestCase):
+    cls_game = GamePythonFlat
+
+    def test_rule(self):
+        # Compared with cells, so items must be ints on Python 2 as well
+        self.assertTrue(all(isinstance(state, int)
+                            for state in GamePythonFlat.RULE))
+
+    def test_tables_cached(self):
+        game = GamePythonFlat(WIDTH, HEIGHT)
+        self.assertTrue(game.neighbor_tables is self.game.neighbor_tables)
+        game.reset()
+        self.assertTrue(game.neighbor_tables is self.game.neighbor_tables)
+
+    def test_tables_cache_bounded(self):
+        cache = GamePythonFlat._neighbor_tables
+        for size in range(3, 4 + GamePythonFlat.MAX_CACHED_TABLES):
+            GamePythonFlat(size, size)
+        self.assertEqual(len(cache), GamePythonFlat.MAX_CACHED_TABLES)
+        self.assertFalse((3, 3) in cache)
+        self.assertTrue((3 + GamePythonFlat.MAX_CACHED_TABLES,
+                         3 + GamePythonFlat.MAX_CACHED_TABLES) in cache)
+
+
+class PopulationTestCase(TestCase):
+    def check_population(self, game):
+        cells = np.array(game.cells, dtype=int)
+        self.assertEqual(game.population(), cells.sum())
+        for row, col, height, width in POPULATION_REGIONS:
+            expected = sum(cells[r % HEIGHT, c % WIDTH]
+                           for r in range(row, row + height)
+                           for c in range(col, col + width))
+            self.assertEqual(game.population(row, col, height, width),
+                             expected)
+        self.assertEqual(game.population(), cells.sum())
+
+    def test_population(self):
+        for cls_game in (GameNumPy, GameNumPyLight, GameNumPyLazy,
+                         GameNumba):
+            game = cls_game(WIDTH, HEIGHT)
+            load_pattern(game, random_pattern(WIDTH, HEIGHT))
+            for _ in range(3):
+                self.check_population(game)
+                game.next_generation()
+            game.populate_random(0.3)
+            self.check_population(game)
+
+    def test_block_population(self):
+        # Blocks are counted from the summed-area table once it's built
+        game = GameNumPyLight(WIDTH, HEIGHT)
+        load_pattern(game, random_pattern(WIDTH, HEIGHT))
+        game.next_generation()
+        game.population(0, 0, 1, 1)
+        for region in BLOCK_REGIONS:
+            self.assertEqual(game.block_population(*region).tolist(),
+                             count_blocks(game.cells, *region))
+
+
+class IterGenerationsTestCase(TestCase):
+    def test_numpy(self):
+        for cls_game in (GameNumPy, GameNumPyLight, GameNumPyLazy):
+            game = cls_game(WIDTH, HEIGHT)
+            reference = GamePython(WIDTH, HEIGHT)
+            load_pattern(game, random_pattern(WIDTH, HEIGHT))
+            load_pattern(reference, random_pattern(WIDTH, HEIGHT))
+
+            previous = np.array(game.cells)
+            for snapshot in game.iter_generations(4):
+                reference.next_generation()
+                self.assertEqual(snapshot.generation, reference.generation)
+                self.assertEqual(snapshot.cells.tolist(),
+                                 [list(reference.cells[row])
+                                  for row in range(HEIGHT)])
+
+                # Views of the game's arrays, not copies
+                self.assertTrue(np.shares_memory(snapshot.cells, game.cells))
+                with self.assertRaises(ValueError):
+                    snapshot.cells[0, 0] = 1
+
+                if cls_game is GameNumPyLight:
+                    self.assertTrue(snapshot.flips is None)
+                else:
+                    self.assertTrue(np.array_equal(
+                        snapshot.flips, snapshot.cells != previous))
+                previous = np.array(snapshot.cells)
+
+            if cls_game is GameNumPy:
+                self.assertTrue(np.array_equal(snapshot.fates, game.fates))
+                self.assertTrue(np.array_equal(snapshot.ages, game.ages))
+            else:
+                self.assertTrue(snapshot.fates is None)
+
+    def test_every(self):
+        game = GameNumPy(WIDTH, HEIGHT)
+        generations = [snapshot.generation
+                       for snapshot in islice(game.iter_generations(every=3),
+                                              4)]
+        self.assertEqual(generations, [4, 7, 10, 13])
+        self.assertEqual(len(list(game.iter_generations(2, every=5))), 2)
+        self.assertEqual(game.generation, 23)
+
+    def test_flat(self):
+        game = GamePythonFlat(WIDTH, HEIGHT)
+        load_pattern(game, random_pattern(WIDTH, HEIGHT))
+        for snapshot in game.iter_generations(3):
+            self.assertEqual(bytes(snapshot.cells), bytes(game.cells))
+        self.assertEqual(snapshot.generation, 4)
+
+    def test_python(self):
+        for cls_game in (GamePython, GamePythonLight, GamePythonLazy):
+            game = cls_game(WIDTH, HEIGHT)
+            load_pattern(game, random_pattern(WIDTH, HEIGHT))
+            for snapshot in game.iter_generations(3):
+                self.assertEqual([list(row) for row in snapshot.cells],
+                                 [list(game.cells[row])
+                                  for row in range(HEIGHT)])
+                with self.assertRaises(TypeError):
+                    snapshot.cells[0][0] = 1
+            self.assertEqual(snapshot.generation, 4)
+
+            if cls_game is GamePython:
+                self.assertEqual(snapshot.fates[2][3], game.fate(2, 3))
+                self.assertEqual(snapshot.ages[2][3], game.age(2, 3))
+            else:
+                self.assertTrue(snapshot.fates is None)
+
+    def test_tiled(self):
+        pattern = random_pattern(WIDTH, HEIGHT)
+        game = GameTiled(WIDTH, HEIGHT, tile_size=4)
+        reference = GameNumPyLight(WIDTH, HEIGHT)
+        load_pattern(reference, pattern)
+        for row, line in enumerate(pattern):
+            for col, cell in enumerate(line):
+                game.set_cell(row, col, cell)
+        for snapshot in game.iter_generations(3):
+            reference.next_generation()
+            self.assertTrue(np.array_equal(snapshot.cells, reference.cells))
+            self.assertFalse(snapshot.cells.flags.writeable)
+
+    def test_checks(self):
+        # Nothing is computed if the snapshots can't be taken
+        game = GameNumPy(WIDTH, HEIGHT)
+        for every in (0, -1):
+            with self.assertRaises(ValueError):
+                game.iter_generations(every=every)
+
+        class GameWithoutSnapshots(GameOfLife):
+            def _init(self):
+                pass
+
+            def _step(self):
+                pass
+        game = GameWithoutSnapshots(WIDTH, HEIGHT)
+        with self.assertRaises(NotImplementedError):
+            game.iter_generations(3)
+        self.assertEqual(game.generation, 1)
+
+
+class GameMemmapTestCase(TestCase):
+    def setUp(self):
+        # Small enough memory bound for stripes of 2 rows
+        self.game = GameMemmap(WIDTH, HEIGHT,
+                               max_memory=4 * (WIDTH + 2) * 4)
+        self.reference = GameNumPy(WIDTH, HEIGHT)
+        self.game.populate_random(0.4)
+        load_pattern(self.reference, np.array(self.game.cells))
+
+    def tearDown(self):
+        self.game.close()
+
+    def test_generations(self):
+        self.assertEqual(self.game.stripe_rows, 2)
+        for _ in range(GENERATIONS):
+            self.game.next_generation()
+            self.reference.next_generation()
+            self.assertTrue(np.array_equal(self.game.cells,
+                                           self.reference.cells))
+
+        fates, _ = self.game.region(HEIGHT - 2, WIDTH - 3, 5, 7)
+        ref_fates, _ = self.reference.region(HEIGHT - 2, WIDTH - 3, 5, 7)
+        self.assertTrue(np.array_equal(fates, ref_fates))
+
+    def test_block_population(self):
+        # Blocks taller than a stripe are read a stripe at a time
+        self.assertTrue(max(region[4] for region in BLOCK_REGIONS) >
+                        self.game.stripe_rows)
+        for region in BLOCK_REGIONS:
+            self.assertEqual(self.game.block_population(*region).tolist(),
+                             count_blocks(self.reference.cells, *region))
+
+    def test_region_memory(self):
+        # Only the region's columns are read, even on a very wide grid
+        if tracemalloc is None:
+            self.skipTest('tracemalloc requires Python 3')
+        game = GameMemmap(200000, HEIGHT, max_memory=3 * 200002 * 4)
+        self.addCleanup(game.close)
+        game.populate_random(0.4, seed=1)
+        reference = GameNumPy(200000, HEIGHT)
+        reference.populate_random(0.4, seed=1)
+
+        tracemalloc.start()
+        try:
+            fates, _ = game.region(HEIGHT - 2, 200000 - 3, 5, 7)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertTrue(peak < 10000)
+        ref_fates, _ = reference.region(HEIGHT - 2, 200000 - 3, 5, 7)
+        self.assertTrue(np.array_equal(fates, ref_fates))
+
+    def test_fork(self):
+        fork, reference_fork = self.game.fork(), self.reference.fork()
+        self.addCleanup(fork.close)
+        for row, col in FLIPS:
+            fork.flip(row, col)
+            reference_fork.flip(row, col)
+
+        for _ in range(3):
+            for game in (self.game, self.reference, fork, reference_fork):
+                game.next_generation()
+            self.assertTrue(np.array_equal(self.game.cells,
+                                           self.reference.cells))
+            self.assertTrue(np.array_equal(fork.cells, reference_fork.cells))
+
+
+class GameTiledTestCase(TestCase):
+    def setUp(self):
+        # Tiles on the bottom and right edges are smaller than the others
+        self.game = GameTiled(WIDTH, HEIGHT, tile_size=4)
+        self.reference = GameNumPy(WIDTH, HEIGHT)
+        pattern = random_pattern(WIDTH, HEIGHT)
+        for row, line in enumerate(pattern):
+            for col, cell in enumerate(line):
+                self.game.set_cell(row, col, cell)
+        load_pattern(self.reference, pattern)
+
+    def test_generations(self):
+        for _ in range(GENERATIONS):
+            self.game.next_generation()
+            self.reference.next_generation()
+            self.assertTrue(np.array_equal(
+                self.game._window(0, 0, HEIGHT, WIDTH),
+                self.reference.cells))
+
+        fates, _ = self.game.region(HEIGHT - 2, WIDTH - 3, 5, 7)
+        ref_fates, _ = self.reference.region(HEIGHT - 2, WIDTH - 3, 5, 7)
+        self.assertTrue(np.array_equal(fates, ref_fates))
+
+    def test_block_population(self):
+        for region in BLOCK_REGIONS:
+            self.assertEqual(self.game.block_population(*region).tolist(),
+                             count_blocks(self.reference.cells, *region))
+
+    def test_fork(self):
+        fork, reference_fork = self.game.fork(), self.reference.fork()
+        for row, col in FLIPS:
+            fork.flip(row, col)
+            reference_fork.flip(row, col)
+        self.assertTrue(np.array_equal(self.game._window(0, 0, HEIGHT, WIDTH),
+                                       self.reference.cells))
+
+        for _ in range(3):
+            for game in (self.game, self.reference, fork, reference_fork):
+                game.next_generation()
+            self.assertTrue(np.array_equal(
+                self.game._window(0, 0, HEIGHT, WIDTH), self.reference.cells))
+            self.assertTrue(np.array_equal(fork._window(0, 0, HEIGHT, WIDTH),
+                                           reference_fork.cells))
+
+    def test_sparse(self):
+        game = GameTiled(10 ** 6, 10 ** 6)
+
+        # A glider crossing the seam of the torus, and a dying cell
+        for row, col in ((-1, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+            game.set_cell(row, col)
+        game.set_cell(5000, 5000)
+        self.assertEqual(len(game.tiles), 4)
+
+        for _ in range(8):
+            game.next_generation()
+        self.assertTrue(len(game.tiles) <= 4)
+        self.assertEqual(sum(int(tile.sum())
+                             for tile in game.tiles.values()), 5)
+
+
+def suite():
+    suite = TestSuite()
+    for case in (GameNumPyTestCase, GamePythonLazyTestCase,
+                 GameNumPyLazyTestCase, GameNumPySciPyTestCase,
+                 GameNumbaTestCase,
+                 GamePythonFlatTestCase, PopulationTestCase,
+                 IterGenerationsTestCase,
+                 GameMemmapTestCase,
+                 GameTiledTestCase):
+        suite.addTest(TestLoader().loadTestsFromTestCase(case))
+    return suite
+
+
+if __name__ == '__main__':
+    TextTestRunner().run(suite())
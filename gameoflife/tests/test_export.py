@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+from unittest import TestCase, TestSuite, TestLoader, TextTestRunner
+
+import numpy as np
+
+from gameoflife.export import (FrameExporter, PALETTE, render, encode_png,
+                               lzw_compress)
+from gameoflife.gameoflife import Fate
+from gameoflife.gamenumpy import GameNumPy
+from gameoflife.tests.test_engines import random_pattern, load_pattern
+
+
+WIDTH, HEIGHT = 17, 11
+
+
+def decode_png(data):
+    """Returns the palette indexes of an indexed-color PNG written by
+    encode_png().
+    """
+    chunks = {}
+    pos = 8
+    while pos < len(data):
+        length, = struct.unpack('!I', data[pos:pos + 4])
+        chunks[data[pos + 4:pos + 8]] = data[pos + 8:pos + 8 + length]
+        pos += length + 12
+    width, height = struct.unpack('!II', chunks[b'IHDR'][:8])
+    rows = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8)
+    return rows.reshape(height, width + 1)[:, 1:]
+
+
+def lzw_decompress(data, min_code_size):
+    """Decompresses GIF LZW data, with a textbook decoder."""
+    clear, end = 1 << min_code_size, (1 << min_code_size) + 1
+    bits = int.from_bytes(data, 'little')
+    pos, out = 0, bytearray()
+    code_size, table, previous = min_code_size + 1, None, None
+    while True:
+        code = (bits >> pos) & ((1 << code_size) - 1)
+        pos += code_size
+        if code == clear:
+            table = [bytes([i]) for i in range(clear)] + [b'', b'']
+            code_size, previous = min_code_size + 1, None
+            continue
+        if code == end:
+            return bytes(out)
+        if code < len(table):
+            entry = table[code]
+            if previous is not None:
+                table.append(previous + entry[:1])
+        else:
+            entry = previous + previous[:1]
+            table.append(entry)
+        out += entry
+        previous = entry
+        if len(table) == 1 << code_size and code_size < 12:
+            code_size += 1
+
+
+def decode_gif(data):
+    """Returns the frames of a GIF written by GifWriter, as palette
+    indexes.
+    """
+    width, height = struct.unpack('<HH', data[6:10])
+    pos = 13 + 3 * len(PALETTE) + 19
+    frames = []
+    while data[pos:pos + 1] != b'\x3b':
+        pos += 8 + 10  # graphic control extension and image descriptor
+        min_code_size = data[pos]
+        pos += 1
+        blocks = bytearray()
+        while data[pos]:
+            blocks += data[pos + 1:pos + 1 + data[pos]]
+            pos += 1 + data[pos]
+        pos += 1
+        pixels = lzw_decompress(bytes(blocks), min_code_size)
+        frames.append(np.frombuffer(pixels, dtype=np.uint8)
+                      .reshape(height, width))
+    return frames
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.game = GameNumPy(WIDTH, HEIGHT)
+        load_pattern(self.game, random_pattern(WIDTH, HEIGHT))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_render(self):
+        fates = np.array([[Fate.StayDead, Fate.Birth, Fate.Survive],
+                          [Fate.DeathByIsolation, Fate.DeathByOvercrowding,
+                           Fate.Survive]])
+        ages = np.array([[7, 0, 0], [1, 3, 1000]])
+        self.assertEqual(render(fates, ages).tolist(),
+                         [[0, 0, 1], [2, 3, 4]])
+        self.assertEqual(render(fates, ages, 2).shape, (4, 6))
+
+    def test_lzw(self):
+        # Long enough to fill the table and start over
+        data = np.random.RandomState(1).randint(0, 8, 50000) \
+            .astype(np.uint8).tobytes()
+        for payload in (data, b'\x01' * 10000, b'\x03'):
+            self.assertEqual(lzw_decompress(lzw_compress(payload, 3), 3),
+                             payload)
+
+    def test_png(self):
+        path = os.path.join(self.tmpdir, 'frame{:04d}.png')
+        expected = {}
+        with FrameExporter(path, scale=3, every=2) as exporter:
+            for _ in range(5):
+                exporter.add(self.game)
+                expected[self.game.generation] = render(
+                    *self.game.region(0, 0, HEIGHT, WIDTH), scale=3)
+                self.game.next_generation()
+        self.assertEqual(exporter.frames, 3)
+        self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                         ['frame0001.png', 'frame0003.png', 'frame0005.png'])
+
+        # Frames are snapshots, even though the game went on while they were
+        # encoded
+        for generation in (1, 3, 5):
+            with open(path.format(generation), 'rb') as f:
+                pixels = decode_png(f.read())
+            self.assertTrue(np.array_equal(pixels, expected[generation]))
+
+    def test_gif(self):
+        path = os.path.join(self.tmpdir, 'run.gif')
+        expected = []
+        with FrameExporter(path, region=(HEIGHT - 2, 3, 5, 20)) as exporter:
+            for _ in range(4):
+                exporter.add(self.game)
+                expected.append(render(*self.game.region(HEIGHT - 2, 3,
+                                                         5, 20)))
+                self.game.next_generation()
+
+        with open(path, 'rb') as f:
+            frames = decode_gif(f.read())
+        self.assertEqual(len(frames), 4)
+        for frame, pixels in zip(frames, expected):
+            self.assertTrue(np.array_equal(frame, pixels))
+
+    def test_png_format(self):
+        pixels = np.array([[0, 4], [1, 2]], dtype=np.uint8)
+        data = encode_png(pixels)
+        self.assertTrue(data.startswith(b'\x89PNG'))
+        self.assertTrue(np.array_equal(decode_png(data), pixels))
+
+
+def suite():
+    suite = TestSuite()
+    suite.addTest(TestLoader().loadTestsFromTestCase(ExportTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    TextTestRunner().run(suite())
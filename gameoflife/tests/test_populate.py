@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+from unittest import TestCase, TestSuite, TestLoader, TextTestRunner
+
+import numpy as np
+
+from gameoflife.gamepython import GamePython, GamePythonFlat
+from gameoflife.gamenumpy import GameNumPy, GameNumPyLight, GameNumPyLazy
+from gameoflife.gamememmap import GameMemmap
+from gameoflife.gametiled import GameTiled
+from gameoflife.populate import RandomCells, BAND_ROWS
+
+
+# More than two bands, and widths that aren't multiples of 8
+WIDTH, HEIGHT = 37, 2 * BAND_ROWS + 21
+
+"""Probabilities checked by the tests, including the packed one and ones
+that aren't multiples of 1/256.
+"""
+PROBS = (0.0, 0.01, 0.3, 0.5, 0.75, 1.0)
+
+
+def grid(game):
+    """Returns the cells of a game as an array, whatever its
+    implementation.
+    """
+    if isinstance(game, GameTiled):
+        return game._window(0, 0, game.height, game.width)
+    if isinstance(game, GamePythonFlat):
+        return np.frombuffer(bytes(game.cells), dtype=np.uint8).reshape(
+            game.height, game.width)
+    if isinstance(game, GamePython):
+        return np.array([list(game.cells[row])
+                         for row in range(game.height)])
+    return np.array(game.cells)
+
+
+class RandomCellsTestCase(TestCase):
+    def test_rows_and_array(self):
+        for prob in PROBS:
+            source = RandomCells(prob, seed=3)
+            cells = source.array(0, HEIGHT, WIDTH)
+            self.assertEqual(cells.dtype, np.uint8)
+            self.assertTrue(np.array_equal(
+                np.frombuffer(source.rows(0, HEIGHT, WIDTH), dtype=np.uint8)
+                .reshape(HEIGHT, WIDTH), cells))
+
+            # Rows across the bands, and part of the columns
+            part = np.zeros((BAND_ROWS, 10), dtype=np.int8)
+            source.fill(part, 50, 20, WIDTH)
+            self.assertTrue(np.array_equal(part,
+                                           cells[50:50 + BAND_ROWS, 20:30]))
+
+    def test_probability(self):
+        for prob in PROBS:
+            cells = RandomCells(prob, seed=1).array(0, 200, 500)
+            self.assertAlmostEqual(cells.mean(), prob, places=2)
+
+    def test_small_probabilities(self):
+        # Probabilities aren't rounded to a multiple of 1/256
+        for prob in (0.001, 0.0019, 0.01):
+            cells = RandomCells(prob, seed=1).array(0, 1000, 1000)
+            self.assertAlmostEqual(cells.mean() / prob, 1, delta=0.1)
+
+    def test_seed(self):
+        cells = RandomCells(0.3, seed=1).array(0, HEIGHT, WIDTH)
+        self.assertTrue(np.array_equal(
+            RandomCells(0.3, seed=1).array(0, HEIGHT, WIDTH), cells))
+        self.assertFalse(np.array_equal(
+            RandomCells(0.3, seed=2).array(0, HEIGHT, WIDTH), cells))
+        self.assertFalse(np.array_equal(
+            RandomCells(0.3).array(0, HEIGHT, WIDTH), cells))
+
+        # The rows don't depend on the height of the grid
+        self.assertTrue(np.array_equal(
+            RandomCells(0.3, seed=1).array(0, 10, WIDTH), cells[:10]))
+
+    def test_engines(self):
+        for prob in PROBS:
+            expected = RandomCells(prob, seed=9).array(0, HEIGHT, WIDTH)
+            games = [cls_game(WIDTH, HEIGHT)
+                     for cls_game in (GamePython, GamePythonFlat, GameNumPy,
+                                      GameNumPyLight, GameNumPyLazy)]
+            games.append(GameMemmap(WIDTH, HEIGHT,
+                                    max_memory=20 * (WIDTH + 2) * 4))
+            games.append(GameTiled(WIDTH, HEIGHT, tile_size=16))
+            for game in games:
+                game.populate_random(prob, seed=9)
+                self.assertTrue(np.array_equal(grid(game), expected))
+                if isinstance(game, GameMemmap):
+                    game.close()
+
+
+def suite():
+    suite = TestSuite()
+    suite.addTest(TestLoader().loadTestsFromTestCase(RandomCellsTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    TextTestRunner().run(suite())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase, TestSuite, TestLoader, TextTestRunner
+
+from gameoflife import engines
+from gameoflife.gamepython import GamePythonFlat
+
+
+class RegistryTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'calibration.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        engines._registry.pop('test-engine', None)
+
+    def test_builtin_engines(self):
+        self.assertEqual(engines.get('flat').load(), GamePythonFlat)
+        self.assertTrue(engines.get('normal').available())
+
+    def test_register(self):
+        engines.register('test-engine', 'nowhere:Nothing',
+                         requires=('no_such_module',),
+                         loader=lambda: GamePythonFlat)
+        self.assertTrue('test-engine' in engines.names())
+        self.assertEqual(engines.get('test-engine').missing(),
+                         ['no_such_module'])
+        self.assertEqual(engines.get('test-engine').load(), GamePythonFlat)
+
+    def test_calibrate(self):
+        timings = engines.calibrate(16, 8, 0.5, budget=0.01)
+        self.assertTrue(timings)
+        for name in timings:
+            self.assertTrue(engines.get(name).full)
+
+    def test_select_engine_cached(self):
+        key = engines.calibration_key(30, 20, 0.52)
+        self.assertEqual(key, engines.calibration_key(30, 20, 0.48))
+        with open(self.path, 'w') as f:
+            json.dump({key: {'engine': 'lazy'}}, f)
+        self.assertEqual(engines.select_engine(30, 20, 0.5, self.path),
+                         'lazy')
+
+
+def suite():
+    suite = TestSuite()
+    suite.addTest(TestLoader().loadTestsFromTestCase(RegistryTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    TextTestRunner().run(suite())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from unittest import TestCase, TestSuite, TestLoader, TextTestRunner
+
+import numpy as np
+
+from gameoflife.gamenumpy import GameNumPy
+from gameoflife.server import (ViewerServer, Viewer, RemoteGame,
+                               age_buckets)
+from gameoflife.tests.test_engines import random_pattern, load_pattern
+
+
+WIDTH, HEIGHT = 17, 11
+
+
+class ViewerServerTestCase(TestCase):
+    def setUp(self):
+        self.game = GameNumPy(WIDTH, HEIGHT)
+        load_pattern(self.game, random_pattern(WIDTH, HEIGHT))
+
+        # Paused server, running in its own thread
+        self.server = ViewerServer(self.game, speed=0)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.run_in_loop(self.server.start('127.0.0.1', 0))
+
+    def tearDown(self):
+        self.run_in_loop(self.server.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def run_in_loop(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def step(self):
+        async def step():
+            self.server.step()
+        self.run_in_loop(step())
+
+    def wait_for(self, client, generation, region):
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            fates, ages = client.region(*region)
+            if client.generation == generation and \
+                    client._frame_viewport == region:
+                return fates, ages
+            client.poll(0.05)
+        self.fail('no frame for generation {}'.format(generation))
+
+    def assertSameRegion(self, client, region):
+        fates, ages = self.wait_for(client, self.game.generation, region)
+        ref_fates, ref_ages = self.game.region(*region)
+        self.assertTrue(np.array_equal(fates, ref_fates))
+        self.assertTrue(np.array_equal(age_buckets(ages),
+                                       age_buckets(ref_ages)))
+
+    def test_viewers(self):
+        # Two viewers looking at different parts of the torus
+        first = RemoteGame(*self.server.address)
+        second = RemoteGame(*self.server.address)
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+        self.assertEqual((first.width, first.height), (WIDTH, HEIGHT))
+
+        for _ in range(8):
+            self.assertSameRegion(first, (0, 0, 5, 7))
+            self.assertSameRegion(second, (HEIGHT - 2, WIDTH - 3, 4, 6))
+            self.step()
+
+        # Moving the viewport
+        self.assertSameRegion(first, (3, 4, 6, 8))
+
+    def test_diffs(self):
+        # A blinker, after the ages of the other cells stopped changing
+        self.game.cells[...] = 0
+        self.game.cells[5, 4:7] = 1
+        self.game._compute_fates()
+        for _ in range(6):
+            self.game.next_generation()
+
+        viewer = Viewer()
+        viewer.set_viewport(0, 0, HEIGHT, WIDTH)
+        self.assertTrue(viewer.frame(self.game)['full'])
+        self.assertTrue(viewer.frame(self.game) is None)
+
+        # After the first full frame, only changes are sent: the cells around
+        # the blinker
+        self.game.next_generation()
+        frame = viewer.frame(self.game)
+        self.assertFalse(frame['full'])
+        self.assertTrue(0 < len(frame['changes']) <= 3 * 5 * 5)
+
+    def test_viewport_checks(self):
+        sock = socket.create_connection(self.server.address)
+        self.addCleanup(sock.close)
+        sock.settimeout(5)
+        stream = sock.makefile('rb')
+        json.loads(stream.readline().decode('utf-8'))
+
+        def request(viewport):
+            sock.sendall(json.dumps({'viewport': viewport}).encode('utf-8') +
+                         b'\n')
+            return json.loads(stream.readline().decode('utf-8'))
+
+        # Regions larger than the grid are clamped to its size
+        frame = request([0, 0, 200000, 200000])
+        self.assertEqual(frame['viewport'], [0, 0, HEIGHT, WIDTH])
+
+        # Invalid viewports are answered with an error, and the connection
+        # stays usable
+        for viewport in ([0, 0, -1, 5], [-3, 0, 2, 2], [0, 0, 2],
+                         [0, 0, 'a', 2], None):
+            self.assertTrue('error' in request(viewport))
+        frame = request([1, 2, 3, 4])
+        self.assertEqual(frame['viewport'], [1, 2, 3, 4])
+
+        # A failure computing a frame doesn't stop the stream
+        region = self.game.region
+        failed = threading.Event()
+
+        def failing_region(*viewport):
+            self.game.region = region
+            failed.set()
+            raise MemoryError
+        self.game.region = failing_region
+        sock.sendall(b'{"viewport": [2, 3, 4, 5]}\n')
+        self.assertTrue(failed.wait(5))
+        frame = request([3, 4, 5, 6])
+        self.assertEqual(frame['viewport'], [3, 4, 5, 6])
+
+    def test_large_viewport(self):
+        # The viewer wraps clamped frames around the torus
+        client = RemoteGame(*self.server.address)
+        self.addCleanup(client.close)
+        region = (1, 2, 2 * HEIGHT, WIDTH + 3)
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            fates, ages = client.region(*region)
+            if client._frame_viewport is not None:
+                break
+            client.poll(0.05)
+        ref_fates, _ = self.game.region(*region)
+        self.assertTrue(np.array_equal(fates, ref_fates))
+
+
+def suite():
+    suite = TestSuite()
+    suite.addTest(TestLoader().loadTestsFromTestCase(ViewerServerTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    TextTestRunner().run(suite())
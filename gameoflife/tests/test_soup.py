@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+from unittest import TestCase, TestSuite, TestLoader, TextTestRunner
+
+import numpy as np
+
+from gameoflife import soup
+
+
+def make_cells(rows):
+    return np.array([[int(c) for c in row] for row in rows], dtype=np.int8)
+
+
+class SoupTestCase(TestCase):
+    def test_classify(self):
+        self.assertEqual(soup.object_name(soup.classify(make_cells(
+            ['11', '11']))), 'block')
+        self.assertEqual(soup.object_name(soup.classify(make_cells(
+            ['1', '1', '1']))), 'blinker')
+
+        # The R-pentomino doesn't settle for a long time
+        self.assertTrue(soup.classify(make_cells(
+            ['011', '110', '010'])).startswith('zz_'))
+
+    def test_classify_orientation(self):
+        glider = make_cells(['010', '001', '111'])
+        self.assertEqual(soup.classify(glider),
+                         soup.classify(glider[::-1, :].T))
+        self.assertTrue(soup.classify(glider).startswith('xq4_'))
+
+    def test_find_objects_wraps(self):
+        cells = np.zeros((10, 12), dtype=np.int8)
+
+        # A block split by both seams of the torus, and a blinker
+        cells[0, 0] = cells[0, -1] = cells[-1, 0] = cells[-1, -1] = 1
+        cells[4:7, 5] = 1
+
+        names = sorted(soup.object_name(soup.classify(obj))
+                       for obj in soup.find_objects(cells))
+        self.assertEqual(names, ['blinker', 'block'])
+
+    def test_run_soup(self):
+        soup.init_worker(32, 32)
+        first = soup.run_soup((7, 0.5, 2000))
+        second = soup.run_soup((7, 0.5, 2000))
+        self.assertEqual(first, second)
+        self.assertEqual(first['seed'], 7)
+
+
+def suite():
+    suite = TestSuite()
+    suite.addTest(TestLoader().loadTestsFromTestCase(SoupTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    TextTestRunner().run(suite())
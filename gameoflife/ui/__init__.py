@@ -22,13 +22,18 @@ from __future__ import (division, absolute_import, print_function,
                         unicode_literals)
 
 import curses
-import imp
 from argparse import ArgumentParser
 
-from gameoflife import __version__
+from gameoflife import __version__, engines
 from gameoflife.ui.app import CursesApp
 
 
+"""Engines listed in the help message. Engines provided by other packages
+are only looked up when selected, to keep startup fast.
+"""
+BUILTIN_ENGINES = engines.names(builtin=True)
+
+
 def init_colors():
     """Initializes curses colors."""
     curses.start_color()
@@ -42,7 +47,7 @@ def init_colors():
     curses.init_pair(7, curses.COLOR_MAGENTA, -1)
 
 
-def curses_wrapped_main(stdscr, args):
+def curses_wrapped_main(stdscr, game, args):
     """curses-wrapped main function."""
 
     # Set up screen
@@ -61,19 +66,6 @@ def curses_wrapped_main(stdscr, args):
     if color:
         init_colors()
 
-    # Load game implementation according to -n flag
-    if args.impl == 'normal':
-        from gameoflife.gamepython import GamePython as GameOfLife
-    elif args.impl == 'light':
-        from gameoflife.gamepython import GamePythonLight as GameOfLife
-    elif args.impl == 'numpy':
-        from gameoflife.gamenumpy import GameNumPy as GameOfLife
-    elif args.impl == 'numpy-light':
-        from gameoflife.gamenumpy import GameNumPyLight as GameOfLife
-
-    # Create the game object
-    game = GameOfLife(args.width, args.height)
-
     # Create the game app and start the event loop
     app_params = {'prob': args.prob,
                   'color': color}
@@ -92,9 +84,10 @@ def main():
                                    'https://github.com/wlof/gameoflife/issues',
                             add_help=False)
     parser.add_argument('--impl', '-i', type=str, default='normal',
-                        choices=['normal', 'light',
-                                 'numpy', 'numpy-light'],
-                        help='game implementation')
+                        help='game implementation: {}, or auto for the '
+                             'fastest full-featured one for the grid size '
+                             'and probability (default: normal)'
+                             .format(', '.join(BUILTIN_ENGINES)))
     parser.add_argument('--width', '-w', type=int, default=100,
                         help='grid width')
     parser.add_argument('--height', '-h', type=int, default=100,
@@ -112,20 +105,6 @@ def main():
     # Parse args
     args = parser.parse_args()
 
-    # Parse numpy flag
-    if args.impl in ('numpy', 'numpy-light'):
-        try:
-            imp.find_module('numpy')
-        except ImportError:
-            parser.error("can't find numpy module. "
-                         "Check if NumPy is installed correctly.")
-
-        try:
-            imp.find_module('scipy')
-        except ImportError:
-            parser.error("can't find scipy module. "
-                         "Check if SciPy is installed correctly.")
-
     # Parse dimensions
     if args.width <= 0:
         parser.error('width needs to be a positive integer')
@@ -136,4 +115,57 @@ def main():
     if not 0.0 <= args.prob <= 1.0:
         parser.error('probability needs to be between 0.0 and 1.0')
 
-    curses.wrapper(curses_wrapped_main, args)
+    # Parse implementation
+    if args.impl == 'auto':
+        print('Selecting the fastest engine...')
+        args.impl = engines.select_engine(args.width, args.height, args.prob)
+    try:
+        engine = engines.get(args.impl)
+    except KeyError:
+        parser.error('unknown implementation {} (choose from {}, auto)'
+                     .format(args.impl, ', '.join(engines.names())))
+    for module in engine.missing():
+        parser.error("can't find {0} module. "
+                     "Check if it is installed correctly.".format(module))
+
+    # Create the game object. Some implementations need more than the grid
+    # size (e.g. the addresses of the workers of the distributed one).
+    try:
+        game = engine.load()(args.width, args.height)
+    except (ValueError, IOError) as e:
+        parser.error(str(e))
+
+    curses.wrapper(curses_wrapped_main, game, args)
+
+
+def viewer_main():
+    """Entry point for gameoflife-viewer."""
+
+    # Not imported at the top, as the server requires Python 3
+    from gameoflife.server import DEFAULT_PORT, RemoteGame
+
+    parser = ArgumentParser(prog='gameoflife-viewer',
+                            description='Views a Game of Life run by '
+                                        'gameoflife-server')
+    parser.add_argument('host', type=str, help='server address')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='server port (default: {})'.format(DEFAULT_PORT))
+    parser.add_argument('--color', '-c', type=str, default='auto',
+                        choices=['auto', 'yes', 'no'],
+                        help='use colors')
+    parser.add_argument('--version', action='version', version=__version__)
+
+    # Parse args. The game is populated by the server, so the probability
+    # is not used.
+    parser.set_defaults(prob=None)
+    args = parser.parse_args()
+
+    try:
+        game = RemoteGame(args.host, args.port)
+    except (IOError, ValueError) as e:
+        parser.error(str(e))
+
+    try:
+        curses.wrapper(curses_wrapped_main, game, args)
+    finally:
+        game.close()
@@ -85,6 +85,7 @@ class CursesApp(object):
         self.quit = False
         self.speed = 1.0
         self.pos_x, self.pos_y = 0, 0
+        self.zoom = 1  # number of cells per character, on each axis
 
         self._last_gen_time = time.time()
         self._last_draw_time = time.time()
@@ -163,7 +164,7 @@ class CursesApp(object):
 
         # Draw the view of the cells
         self.cells_view.draw(self.game, self.pos_x, self.pos_y,
-                             self.params['color'])
+                             self.params['color'], self.zoom)
         self.cells_view.refresh(wait=True)
 
         # Actually redraw the screen
@@ -203,18 +204,45 @@ class CursesApp(object):
             if self.speed < self.MIN_SPEED:
                 self.speed = self.MIN_SPEED
 
+    def max_zoom(self):
+        """Returns the zoom level at which the whole torus fits in the
+        cells view.
+        """
+        zoom = 1
+        while zoom * self.cells_view.width < self.game.width or \
+                zoom * self.cells_view.height < self.game.height:
+            zoom *= 2
+        return zoom
+
+    @handler_for('[')
+    def zoom_out(self):
+        """Zooms out, up to the level where the whole torus is visible."""
+        if self.zoom >= self.max_zoom():
+            return
+        try:
+            self.game.block_population(0, 0, 1, 1, self.zoom * 2)
+        except NotImplementedError:
+            # The implementation can't count the cells of a block
+            return
+        self.zoom *= 2
+
+    @handler_for(']')
+    def zoom_in(self):
+        """Zooms in, down to one cell per character."""
+        self.zoom = max(1, self.zoom // 2)
+
     @handler_for(curses.KEY_LEFT)
     def move_left(self):
-        self.pos_x = (self.pos_x - 1) % self.game.width
+        self.pos_x = (self.pos_x - self.zoom) % self.game.width
 
     @handler_for(curses.KEY_RIGHT)
     def move_right(self):
-        self.pos_x = (self.pos_x + 1) % self.game.width
+        self.pos_x = (self.pos_x + self.zoom) % self.game.width
 
     @handler_for(curses.KEY_UP)
     def move_up(self):
-        self.pos_y = (self.pos_y - 1) % self.game.height
+        self.pos_y = (self.pos_y - self.zoom) % self.game.height
 
     @handler_for(curses.KEY_DOWN)
     def move_down(self):
-        self.pos_y = (self.pos_y + 1) % self.game.height
+        self.pos_y = (self.pos_y + self.zoom) % self.game.height
@@ -55,6 +55,9 @@ class CellsView(View):
                        Fate.DeathByIsolation: str('*'),
                        Fate.DeathByOvercrowding: str('O')}
 
+    # Characters used when zoomed out, from empty blocks to full ones
+    DENSITY_CHARS = str(' .:-=+*#%@')
+
     def ink(self, age):
         """Returns the color to use according to how old the cell is."""
         if age == 0:
@@ -67,17 +70,26 @@ class CellsView(View):
             ink = curses.color_pair(1) | curses.A_BOLD
         return ink
 
-    def draw(self, game, pos_x, pos_y, color):
-        """Draws the cells."""
+    def draw(self, game, pos_x, pos_y, color, zoom=1):
+        """Draws the cells, or blocks of zoom x zoom cells if zoom is more
+        than 1.
+        """
+        if zoom > 1:
+            self.draw_blocks(game, pos_x, pos_y, color, zoom)
+            return
+
+        # Query the fates and ages of the visible cells all at once
+        fates, ages = game.region(pos_y, pos_x, self.height, self.width)
+
         for row in range(self.height):
             for col in range(self.width):
                 # Choose char according to fate
-                fate = game.fate(row + pos_y, col + pos_x)
+                fate = fates[row][col]
                 char = self.MAP_FATES_CHARS[fate]
 
                 # Choose ink according to age
                 if color:
-                    age = game.age(row + pos_y, col + pos_x)
+                    age = ages[row][col]
                     ink = self.ink(age)
                 else:
                     ink = 0
@@ -91,6 +103,32 @@ class CellsView(View):
                     # Just ignore it.
                     pass
 
+    def draw_blocks(self, game, pos_x, pos_y, color, zoom):
+        """Draws blocks of zoom x zoom cells, with characters showing how
+        many of their cells are alive.
+        """
+
+        # Count the live cells of the visible blocks all at once
+        blocks = game.block_population(pos_y, pos_x, self.height, self.width,
+                                       zoom)
+
+        # Any live cell shows up, and only full blocks get the last character
+        levels = len(self.DENSITY_CHARS) - 1
+        size = zoom * zoom
+        ink = curses.color_pair(1) | curses.A_BOLD if color else 0
+
+        for row in range(self.height):
+            line = blocks[row]
+            for col in range(self.width):
+                char = self.DENSITY_CHARS[-(-int(line[col]) * levels // size)]
+
+                # Draw the block
+                try:
+                    self.window.addch(row, col, char, ink)
+                except curses.error:
+                    # Same as above
+                    pass
+
 
 class GameView(View):
     """A curses-based view of the whole game."""
@@ -102,8 +140,10 @@ class GameView(View):
         self.window.border()
 
         # Position
-        self.window.addstr(0, 2, ' X = {} - Y = {} '.format(app.pos_x,
-                                                            app.pos_y))
+        position = ' X = {} - Y = {} '.format(app.pos_x, app.pos_y)
+        if app.zoom > 1:
+            position += '- Zoom = 1:{} '.format(app.zoom)
+        self.window.addstr(0, 2, position)
 
         # Clock
         self.window.addstr(0, self.width - 12, time.strftime(' %H:%M:%S '))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""Measures the time taken to compute a generation by each of the selected
+engines, on the same randomly populated grid.
+
+The first generations are not measured, so that compilation (for the numba
+engine) and first memory accesses don't count.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+# Measure the checkout this script belongs to
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from gameoflife import engines  # noqa: E402
+
+
+"""Number of generations computed before measuring."""
+WARMUP = 2
+
+
+def measure(impl, size, prob, generations):
+    """Returns the median time taken to compute a generation, in
+    milliseconds.
+    """
+    game = engines.get(impl).load()(size, size)
+    game.populate_random(prob, seed=1)
+    for _ in range(WARMUP):
+        game.next_generation()
+
+    times = []
+    for _ in range(generations):
+        start = time.time()
+        game.next_generation()
+        times.append((time.time() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    parser = ArgumentParser(description='Measures the time taken to compute '
+                                        'a generation by each engine.')
+    parser.add_argument('impls', nargs='*',
+                        default=['numba', 'numpy', 'numpy-light'],
+                        help='engines to measure')
+    parser.add_argument('--size', '-s', type=int, default=2000,
+                        help='width and height of the grid')
+    parser.add_argument('--prob', '-p', type=float, default=0.3,
+                        help='initial population probability')
+    parser.add_argument('--generations', '-n', type=int, default=10,
+                        help='number of generations measured')
+    args = parser.parse_args()
+
+    for impl in args.impls:
+        print('{:12} {:8.1f} ms per generation'.format(
+            impl, measure(impl, args.size, args.prob, args.generations)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# This file is part of gameoflife.
+# Copyright 2015, wlof.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+
+"""Measures the startup time of gameoflife, and checks it against the
+startup budget (see README.md).
+
+Each measurement runs a fresh interpreter, which imports the UI module,
+loads the selected engine and creates a randomly populated 100x100 game:
+everything the gameoflife command does before its event loop starts. The
+time taken by the interpreter itself and by importing the libraries the
+engine can't do without (e.g. NumPy) is measured separately and subtracted,
+so that the budget only covers gameoflife's own overhead.
+"""
+
+from __future__ import (division, absolute_import, print_function,
+                        unicode_literals)
+
+import os
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+# Measure the checkout this script belongs to
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from gameoflife import engines  # noqa: E402
+
+
+"""Startup budget: gameoflife's own overhead, in milliseconds."""
+BUDGET_MS = 50
+
+"""Modules that must not be imported at startup."""
+FORBIDDEN_MODULES = ('scipy',)
+
+STARTUP_CODE = '''
+import sys
+import gameoflife.ui
+from gameoflife import engines
+game = engines.get({impl!r}).load()(100, 100)
+game.populate_random(0.5)
+forbidden = [m for m in {forbidden!r} if m in sys.modules]
+if forbidden:
+    sys.exit('imported at startup: ' + ', '.join(forbidden))
+'''
+
+BASELINE_CODE = '''
+for module in {requires!r}:
+    __import__(module)
+'''
+
+
+def measure(code, runs):
+    """Returns the median time taken to run code in a fresh interpreter, in
+    milliseconds.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', code], cwd=ROOT)
+        times.append((time.time() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    parser = ArgumentParser(description='Measures the startup time of '
+                                        'gameoflife.')
+    parser.add_argument('--impl', '-i', type=str, default='numpy',
+                        help='game implementation')
+    parser.add_argument('--runs', '-n', type=int, default=11,
+                        help='number of runs (the median is used)')
+    args = parser.parse_args()
+
+    requires = engines.get(args.impl).requires
+
+    baseline = measure(BASELINE_CODE.format(requires=requires), args.runs)
+    startup = measure(STARTUP_CODE.format(impl=args.impl,
+                                          forbidden=FORBIDDEN_MODULES),
+                      args.runs)
+    overhead = startup - baseline
+
+    print('interpreter and required libraries: {:7.1f} ms'.format(baseline))
+    print('startup:                            {:7.1f} ms'.format(startup))
+    print('gameoflife overhead:                {:7.1f} ms (budget: {} ms)'
+          .format(overhead, BUDGET_MS))
+
+    if overhead > BUDGET_MS:
+        sys.exit('startup budget exceeded')
+
+
+if __name__ == '__main__':
+    main()
@@ -25,5 +25,11 @@ setup(name='gameoflife',
                    'Programming Language :: Python :: 3',
                    'Programming Language :: Python :: 3.4'],
       entry_points={
-          'console_scripts': ['gameoflife = gameoflife.ui:main']
+          'console_scripts': ['gameoflife = gameoflife.ui:main',
+                              'gameoflife-soup = gameoflife.soup:main',
+                              'gameoflife-worker = '
+                              'gameoflife.distributed:main',
+                              'gameoflife-server = gameoflife.server:main',
+                              'gameoflife-viewer = gameoflife.ui:viewer_main',
+                              'gameoflife-export = gameoflife.export:main']
       })